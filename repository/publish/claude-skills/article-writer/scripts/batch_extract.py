@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+PDF批量提取脚本
+一次处理整个目录（或通配符匹配）的PDF，所有文档共享一个进程池，
+每份文档输出文本和图表到各自的子目录，最后汇总统计
+"""
+
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import extract_text
+import extract_charts
+import ingest
+import charts_db
+
+
+def collect_pdfs(inputs):
+    """把目录、通配符和文件路径展开成去重后的PDF列表"""
+    pdf_paths = []
+    seen = set()
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob('*.pdf')) + sorted(path.glob('*.PDF'))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in sorted(glob.glob(item, recursive=True))]
+
+        for match in matches:
+            resolved = match.resolve()
+            if match.is_file() and resolved not in seen:
+                seen.add(resolved)
+                pdf_paths.append(match)
+
+    return pdf_paths
+
+
+def assign_output_dirs(pdf_paths, output_root):
+    """为每份PDF分配输出子目录，同名文件追加序号避免互相覆盖"""
+    used = set()
+    output_dirs = []
+
+    for pdf_path in pdf_paths:
+        name = pdf_path.stem
+        suffix = 2
+        while name in used:
+            name = f"{pdf_path.stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        output_dirs.append(Path(output_root) / name)
+
+    return output_dirs
+
+
+def process_document(pdf_path, doc_dir, options):
+    """在工作进程中处理一份PDF，返回该文档的统计信息（失败时记录错误）"""
+    start = time.perf_counter()
+    result = {
+        'pdf': str(pdf_path),
+        'output_dir': str(doc_dir),
+        'pages': 0,
+        'chars': 0,
+        'chinese_chars': 0,
+        'words': 0,
+        'images': 0,
+        'seconds': 0.0,
+        'error': None,
+    }
+
+    try:
+        doc_dir.mkdir(parents=True, exist_ok=True)
+
+        method = options['method']
+        cache = None
+        if options['text'] and not options['no_cache']:
+            cache_options = extract_text.ADAPTIVE_OPTIONS if method == 'adaptive' else None
+            cache = extract_text.PageCache(options['cache_dir'], pdf_path, method, cache_options)
+
+        if options['text'] and options['charts'] and method == 'pdfplumber':
+            # 文本和图表都要时，每页只解析一次
+            stats, total_pages, charts_info = ingest.ingest_pdf(
+                pdf_path, doc_dir / 'text.txt', doc_dir / 'charts', cache=cache, verbose=False)
+            result['images'] = len(charts_info)
+        else:
+            stats = None
+            if options['text']:
+                if cache is not None:
+                    total_pages = cache.page_count
+                    if total_pages is None:
+                        total_pages = extract_text.get_page_count(pdf_path, method)
+                        cache.page_count = total_pages
+                    page_numbers = list(range(1, total_pages + 1))
+                    pages = extract_text.iter_pages_cached(
+                        pdf_path, method, cache, page_numbers, verbose=False)
+                else:
+                    pages = extract_text.iter_pages(pdf_path, method, verbose=False)
+
+                stats, total_pages = extract_text.extract_to_file(pages, doc_dir / 'text.txt')
+
+            if options['charts']:
+                charts_dir = doc_dir / 'charts'
+                charts_info, total_images = extract_charts.extract_images_from_pdf(
+                    pdf_path, charts_dir, verbose=False)
+                extract_charts.save_charts_manifest(charts_info, charts_dir)
+                result['images'] = total_images
+
+        if stats is not None:
+            result.update({
+                'pages': total_pages,
+                'chars': stats.total_chars,
+                'chinese_chars': stats.chinese_chars,
+                'words': stats.total_words,
+            })
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def print_summary(results, elapsed):
+    """打印批量处理汇总表"""
+    succeeded = [r for r in results if not r['error']]
+    failed = [r for r in results if r['error']]
+
+    print()
+    print("=" * 78)
+    print(f"  {'文档':<30}{'页数':>6}{'字符':>12}{'字数':>10}{'图片':>6}{'耗时(秒)':>10}")
+    print("-" * 78)
+    for r in results:
+        name = Path(r['pdf']).name
+        if len(name) > 28:
+            name = name[:25] + '...'
+        status = '  ❌ 失败' if r['error'] else ''
+        print(f"  {name:<30}{r['pages']:>6}{r['chars']:>12,}{r['words']:>10,}"
+              f"{r['images']:>6}{r['seconds']:>10.2f}{status}")
+    print("-" * 78)
+    print(f"  {'合计':<30}{sum(r['pages'] for r in results):>6}"
+          f"{sum(r['chars'] for r in results):>12,}{sum(r['words'] for r in results):>10,}"
+          f"{sum(r['images'] for r in results):>6}{elapsed:>10.2f}")
+    print("=" * 78)
+    print()
+    print(f"✅ 成功：{len(succeeded)} 份")
+    if failed:
+        print(f"❌ 失败：{len(failed)} 份")
+        for r in failed:
+            print(f"  • {r['pdf']}：{r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量提取目录中所有PDF的文本和图表')
+    parser.add_argument('inputs', nargs='+', help='PDF所在目录、通配符（如 "papers/**/*.pdf"）或PDF文件')
+    parser.add_argument('output_root', help='输出根目录，每份PDF一个子目录')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='并行处理的进程数（默认：CPU核数）')
+    parser.add_argument('--method', choices=['pdfplumber', 'pypdf', 'pypdf2', 'adaptive', 'auto'],
+                       default='auto', help='文本提取方法（默认：auto）')
+    parser.add_argument('--no-text', action='store_true', help='不提取文本')
+    parser.add_argument('--no-charts', action='store_true', help='不提取图表')
+    parser.add_argument('--no-cache', action='store_true', help='不使用文本提取缓存')
+    parser.add_argument('--cache-dir', default=str(extract_text.DEFAULT_CACHE_DIR),
+                       help='文本提取缓存目录')
+    parser.add_argument('--db',
+                       help='把所有文档的图表清单写入该SQLite数据库，便于跨文档查询')
+
+    args = parser.parse_args()
+
+    pdf_paths = collect_pdfs(args.inputs)
+    if not pdf_paths:
+        print("❌ 错误：没有找到PDF文件")
+        sys.exit(1)
+
+    # 检查依赖
+    method = args.method
+    if method == 'auto':
+        method = 'pdfplumber' if extract_text.PDFPLUMBER_AVAILABLE else 'pypdf2'
+    method_available = {
+        'pdfplumber': extract_text.PDFPLUMBER_AVAILABLE,
+        'pypdf': extract_text.PYPDF_AVAILABLE,
+        'adaptive': extract_text.PYPDF_AVAILABLE,
+        'pypdf2': extract_text.PYPDF2_AVAILABLE,
+    }
+    if not args.no_text and not method_available[method]:
+        print(f"❌ 错误：文本提取方法 {method} 所需的库未安装")
+        print("请运行：pip install -r requirements.txt")
+        sys.exit(1)
+    if not args.no_charts and not extract_charts.LIBRARIES_AVAILABLE:
+        print("❌ 错误：缺少图表提取所需的库")
+        print("请运行：pip install pdfplumber Pillow pdf2image")
+        sys.exit(1)
+
+    output_root = Path(args.output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    output_dirs = assign_output_dirs(pdf_paths, output_root)
+
+    options = {
+        'text': not args.no_text,
+        'charts': not args.no_charts,
+        'method': method,
+        'no_cache': args.no_cache,
+        'cache_dir': args.cache_dir,
+    }
+
+    print(f"📚 批量提取 {len(pdf_paths)} 份PDF...")
+    print(f"📁 输出目录：{output_root}")
+    print()
+
+    # 数据库只在主进程中写入，避免多个工作进程争用写锁
+    conn = None
+    if args.db and options['charts']:
+        conn = charts_db.open_db(args.db)
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(process_document, pdf_path, doc_dir, options)
+            for pdf_path, doc_dir in zip(pdf_paths, output_dirs)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if conn is not None and not result['error']:
+                charts_db.index_manifest(conn, result['pdf'], Path(result['output_dir']) / 'charts')
+            mark = '❌' if result['error'] else '✓'
+            print(f"  {mark} [{done}/{len(futures)}] {Path(result['pdf']).name}"
+                  f"（{result['seconds']:.1f} 秒）")
+    elapsed = time.perf_counter() - start
+    if conn is not None:
+        conn.close()
+
+    # 缓存淘汰只在主进程中做一次，工作进程之间不会互相删除正在使用的缓存
+    if options['text'] and not options['no_cache']:
+        extract_text.evict_cache(options['cache_dir'])
+
+    # 按输入顺序输出汇总
+    order = {str(p): i for i, p in enumerate(pdf_paths)}
+    results.sort(key=lambda r: order[r['pdf']])
+
+    print_summary(results, elapsed)
+
+    summary_path = output_root / 'batch_summary.json'
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'total_documents': len(results),
+            'failed': sum(1 for r in results if r['error']),
+            'seconds': elapsed,
+            'documents': results,
+        }, f, indent=2, ensure_ascii=False)
+
+    print()
+    print(f"📋 汇总文件：{summary_path}")
+    if conn is not None:
+        print(f"🗃️  图表数据库：{args.db}")
+
+    if any(r['error'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+批量生成PDF脚本
+一次把多篇Markdown（目录、通配符或清单文件）转为PDF，
+多个进程并行渲染，每个进程只导入一次WeasyPrint、解析一次样式表并复用字体配置，
+最后汇总每篇的耗时、大小和失败原因
+"""
+
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import generate_pdf
+
+
+def collect_markdown(inputs):
+    """把目录、通配符和文件路径展开成去重后的Markdown文件列表"""
+    md_paths = []
+    seen = set()
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob('*.md'))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in sorted(glob.glob(item, recursive=True))]
+
+        for match in matches:
+            resolved = match.resolve()
+            if match.is_file() and resolved not in seen:
+                seen.add(resolved)
+                md_paths.append(match)
+
+    return md_paths
+
+
+def load_manifest(manifest_path):
+    """读取清单文件，返回任务列表 [{'md', 'pdf', 'images_dir'}]
+
+    清单是JSON数组（或带 "articles" 键的对象），每项至少包含 "md"，
+    可选 "pdf" 和 "images_dir"。相对路径按清单文件所在目录解析。
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('articles', [])
+
+    base_dir = manifest_path.parent
+    jobs = []
+    for entry in data:
+        if isinstance(entry, str):
+            entry = {'md': entry}
+        jobs.append({
+            'md': base_dir / entry['md'],
+            'pdf': base_dir / entry['pdf'] if entry.get('pdf') else None,
+            'images_dir': str(base_dir / entry['images_dir']) if entry.get('images_dir') else None,
+        })
+    return jobs
+
+
+def find_duplicate_pdf_paths(jobs):
+    """返回被多个任务显式指定的PDF路径 {路径: [Markdown文件, ...]}"""
+    owners = {}
+    for job in jobs:
+        if job['pdf'] is not None:
+            owners.setdefault(Path(job['pdf']).resolve(), []).append(job['md'])
+    return {pdf_path: mds for pdf_path, mds in owners.items() if len(mds) > 1}
+
+
+def assign_pdf_paths(jobs, output_dir):
+    """为没有指定PDF路径的任务分配输出文件，同名文章追加序号避免互相覆盖"""
+    used = {job['pdf'].resolve() for job in jobs if job['pdf'] is not None}
+
+    for job in jobs:
+        if job['pdf'] is not None:
+            continue
+        md_path = Path(job['md'])
+        target_dir = Path(output_dir) if output_dir else md_path.parent
+        name = md_path.stem
+        suffix = 2
+        while (target_dir / f"{name}.pdf").resolve() in used:
+            name = f"{md_path.stem}_{suffix}"
+            suffix += 1
+        job['pdf'] = target_dir / f"{name}.pdf"
+        used.add(job['pdf'].resolve())
+
+    return jobs
+
+
+def _init_worker():
+    """工作进程初始化：导入渲染库，预先解析样式表并加载字体"""
+    try:
+        generate_pdf.warm_up()
+    except Exception as e:
+        # 预热失败不影响后续任务，真正的问题会记录在对应文章的错误信息中
+        print(f"⚠️  警告：工作进程预热失败：{e}", file=sys.stderr)
+
+
+def _new_result(job):
+    """一篇文章的统计信息（尚未生成）"""
+    return {
+        'md': str(job['md']),
+        'pdf': str(job['pdf']),
+        'size': 0,
+        'images': 0,
+        'render_seconds': 0.0,
+        'seconds': 0.0,
+        'error': None,
+    }
+
+
+def render_article(job, options):
+    """在工作进程中生成一篇PDF，返回该文章的统计信息（失败时记录错误）"""
+    start = time.perf_counter()
+    result = _new_result(job)
+
+    try:
+        Path(job['pdf']).parent.mkdir(parents=True, exist_ok=True)
+        info = generate_pdf.generate_pdf(
+            job['md'], job['pdf'], verbose=False,
+            images_dir=job.get('images_dir') or options['images_dir'],
+            image_dpi=options['image_dpi'],
+            jpeg_quality=options['jpeg_quality'],
+        )
+        result.update({
+            'size': info['size'],
+            'images': info['images']['images'] if info['images'] else 0,
+            'render_seconds': info['render_seconds'],
+        })
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def print_summary(results, elapsed):
+    """打印批量生成汇总表"""
+    succeeded = [r for r in results if not r['error']]
+    failed = [r for r in results if r['error']]
+
+    print()
+    print("=" * 72)
+    print(f"  {'文章':<34}{'大小(MB)':>10}{'图片':>6}{'渲染(秒)':>10}{'耗时(秒)':>10}")
+    print("-" * 72)
+    for r in results:
+        name = Path(r['md']).name
+        if len(name) > 32:
+            name = name[:29] + '...'
+        status = '  ❌ 失败' if r['error'] else ''
+        print(f"  {name:<34}{r['size'] / 1024 / 1024:>10.2f}{r['images']:>6}"
+              f"{r['render_seconds']:>10.2f}{r['seconds']:>10.2f}{status}")
+    print("-" * 72)
+    print(f"  {'合计':<34}{sum(r['size'] for r in results) / 1024 / 1024:>10.2f}"
+          f"{sum(r['images'] for r in results):>6}"
+          f"{sum(r['render_seconds'] for r in results):>10.2f}{elapsed:>10.2f}")
+    print("=" * 72)
+    print()
+    print(f"✅ 成功：{len(succeeded)} 篇")
+    if succeeded:
+        slowest = max(succeeded, key=lambda r: r['seconds'])
+        print(f"🐢 最慢：{Path(slowest['md']).name}（{slowest['seconds']:.2f} 秒）")
+    if failed:
+        print(f"❌ 失败：{len(failed)} 篇")
+        for r in failed:
+            print(f"  • {r['md']}：{r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量将Markdown转换为PDF（多进程并行）')
+    parser.add_argument('inputs', nargs='*',
+                       help='Markdown所在目录、通配符（如 "articles/**/*.md"）或Markdown文件')
+    parser.add_argument('--manifest',
+                       help='JSON清单文件：[{"md": ..., "pdf": ..., "images_dir": ...}, ...]')
+    parser.add_argument('--output-dir',
+                       help='PDF输出目录（默认：与Markdown文件同目录）')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='并行渲染的进程数（默认：CPU核数）')
+    parser.add_argument('--images-dir', help='图片目录路径（清单中未指定时使用）')
+    parser.add_argument('--image-dpi', type=generate_pdf.image_dpi_type,
+                       default=generate_pdf.DEFAULT_IMAGE_DPI,
+                       help=f'图片按该打印分辨率缩小后再嵌入（默认：{generate_pdf.DEFAULT_IMAGE_DPI}）')
+    parser.add_argument('--jpeg-quality', type=int, default=generate_pdf.DEFAULT_JPEG_QUALITY,
+                       help=f'照片类图片重新压缩为JPEG的质量（默认：{generate_pdf.DEFAULT_JPEG_QUALITY}）')
+    parser.add_argument('--no-optimize-images', action='store_true',
+                       help='按原始分辨率嵌入图片')
+    parser.add_argument('--summary', help='把汇总结果写入该JSON文件')
+
+    args = parser.parse_args()
+
+    if not generate_pdf.WEASYPRINT_AVAILABLE:
+        print("❌ 错误：缺少必要的库")
+        print("请运行：pip install markdown2 weasyprint")
+        sys.exit(1)
+
+    jobs = [{'md': md_path, 'pdf': None, 'images_dir': None}
+            for md_path in collect_markdown(args.inputs)]
+    if args.manifest:
+        if not Path(args.manifest).exists():
+            print(f"❌ 错误：找不到清单文件：{args.manifest}")
+            sys.exit(1)
+        jobs.extend(load_manifest(args.manifest))
+    if not jobs:
+        print("❌ 错误：没有找到Markdown文件")
+        sys.exit(1)
+
+    missing = [job['md'] for job in jobs if not Path(job['md']).is_file()]
+    if missing:
+        for md_path in missing:
+            print(f"❌ 错误：找不到Markdown文件：{md_path}")
+        sys.exit(1)
+
+    # 清单中显式指定的输出路径重复时并行渲染会互相覆盖，不自动改名
+    duplicates = find_duplicate_pdf_paths(jobs)
+    if duplicates:
+        for pdf_path, mds in duplicates.items():
+            print(f"❌ 错误：多篇文章输出到同一个PDF：{pdf_path}")
+            for md_path in mds:
+                print(f"  • {md_path}")
+        sys.exit(1)
+
+    assign_pdf_paths(jobs, args.output_dir)
+
+    options = {
+        'images_dir': args.images_dir,
+        'image_dpi': 0 if args.no_optimize_images else args.image_dpi,
+        'jpeg_quality': args.jpeg_quality,
+    }
+
+    print(f"📚 批量生成 {len(jobs)} 篇PDF...")
+    if args.output_dir:
+        print(f"📁 输出目录：{args.output_dir}")
+    print()
+
+    start = time.perf_counter()
+    # 按输入顺序存放结果（同一篇文章可能以不同输出路径出现多次）
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(render_article, job, options): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            job_index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程崩溃（BrokenProcessPool）时拿不到结果，记为该文章失败，汇总照常写出
+                result = _new_result(jobs[job_index])
+                result['error'] = f"{type(e).__name__}: {e}"
+            results[job_index] = result
+            mark = '❌' if result['error'] else '✓'
+            print(f"  {mark} [{done}/{len(futures)}] {Path(result['md']).name}"
+                  f"（{result['seconds']:.1f} 秒）")
+    elapsed = time.perf_counter() - start
+
+    print_summary(results, elapsed)
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump({
+                'total_articles': len(results),
+                'failed': sum(1 for r in results if r['error']),
+                'seconds': elapsed,
+                'articles': results,
+            }, f, indent=2, ensure_ascii=False)
+        print()
+        print(f"📋 汇总文件：{args.summary}")
+
+    if any(r['error'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+图表清单数据库
+把 charts_manifest.json 同步到SQLite，便于跨文档按页码、尺寸、类型、哈希查询
+（JSON清单照常写出，数据库只是额外的索引）
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    pdf_path TEXT NOT NULL UNIQUE,
+    charts_dir TEXT NOT NULL,
+    total_charts INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS charts (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    encoding TEXT,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER,
+    hash TEXT,
+    occurrences INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (document_id, filename)
+);
+
+-- 每次出现一行（去重后的图片可能出现在多页）
+CREATE TABLE IF NOT EXISTS occurrences (
+    chart_id INTEGER NOT NULL REFERENCES charts(id) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    idx INTEGER,
+    x0 REAL, top REAL, x1 REAL, bottom REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_charts_document ON charts(document_id);
+CREATE INDEX IF NOT EXISTS idx_charts_hash ON charts(hash);
+CREATE INDEX IF NOT EXISTS idx_occurrences_chart ON occurrences(chart_id);
+CREATE INDEX IF NOT EXISTS idx_occurrences_page ON occurrences(page);
+"""
+
+
+def open_db(db_path):
+    """打开（必要时创建）图表数据库"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def upsert_charts(conn, pdf_path, charts_dir, charts_info):
+    """写入一份文档的图表记录，重复运行时整体替换该文档的旧记录
+
+    先删除该文档的全部图表（出现记录随外键级联删除）再重新插入，都在同一个事务里完成，
+    已不再产出的图表（如换了页码范围）自然被移除，不受SQLite单条语句参数个数的限制。
+    """
+    pdf_path = str(Path(pdf_path).resolve())
+    charts_dir = str(Path(charts_dir).resolve())
+
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO documents (pdf_path, charts_dir, total_charts, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(pdf_path) DO UPDATE SET
+                charts_dir = excluded.charts_dir,
+                total_charts = excluded.total_charts,
+                updated_at = excluded.updated_at
+            """,
+            (pdf_path, charts_dir, len(charts_info), time.time()),
+        )
+        document_id = conn.execute(
+            "SELECT id FROM documents WHERE pdf_path = ?", (pdf_path,)).fetchone()[0]
+
+        conn.execute("DELETE FROM charts WHERE document_id = ?", (document_id,))
+        for chart in charts_info:
+            occurrences = chart.get('occurrences') or [{
+                'page': chart['page'], 'index': chart.get('index'), 'bbox': chart.get('bbox'),
+            }]
+            chart_id = conn.execute(
+                """
+                INSERT INTO charts (document_id, filename, page, type, encoding,
+                                    width, height, bytes, hash, occurrences)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (document_id, chart['filename'], chart['page'], chart.get('type', 'embedded'),
+                 chart.get('encoding'), chart.get('width'), chart.get('height'),
+                 chart.get('bytes'), chart.get('hash'), len(occurrences)),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO occurrences (chart_id, page, idx, x0, top, x1, bottom) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(chart_id, o['page'], o.get('index'), *(o.get('bbox') or [None] * 4))
+                 for o in occurrences],
+            )
+
+    return document_id
+
+
+def index_manifest(conn, pdf_path, charts_dir):
+    """读取图表目录下的 charts_manifest.json 并写入数据库，返回图表数"""
+    manifest_path = Path(charts_dir) / "charts_manifest.json"
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        charts_info = json.load(f).get('charts', [])
+    upsert_charts(conn, pdf_path, charts_dir, charts_info)
+    return len(charts_info)
+
+
+def query_charts(conn, document=None, page=None, chart_type=None, chart_hash=None,
+                 min_width=None, min_height=None, limit=None):
+    """按条件查询图表，page 匹配任意一次出现所在的页码"""
+    conditions = []
+    params = []
+    if document:
+        conditions.append("d.pdf_path LIKE ?")
+        params.append(f"%{document}%")
+    if page is not None:
+        conditions.append("c.id IN (SELECT chart_id FROM occurrences WHERE page = ?)")
+        params.append(page)
+    if chart_type:
+        conditions.append("c.type = ?")
+        params.append(chart_type)
+    if chart_hash:
+        conditions.append("c.hash LIKE ?")
+        params.append(f"{chart_hash}%")
+    if min_width:
+        conditions.append("c.width >= ?")
+        params.append(min_width)
+    if min_height:
+        conditions.append("c.height >= ?")
+        params.append(min_height)
+
+    sql = """
+        SELECT d.pdf_path, d.charts_dir, c.filename, c.page, c.type, c.encoding,
+               c.width, c.height, c.bytes, c.hash, c.occurrences
+        FROM charts c JOIN documents d ON d.id = c.document_id
+    """
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY d.pdf_path, c.page, c.filename"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def print_db_summary(conn):
+    """打印数据库概况"""
+    documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    charts, occurrences, total_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(occurrences), 0), COALESCE(SUM(bytes), 0) FROM charts"
+    ).fetchone()
+    shared = conn.execute(
+        "SELECT COUNT(*) FROM (SELECT hash FROM charts WHERE hash IS NOT NULL "
+        "GROUP BY hash HAVING COUNT(DISTINCT document_id) > 1)"
+    ).fetchone()[0]
+
+    print("📊 图表数据库概况：")
+    print(f"  • 文档数：{documents}")
+    print(f"  • 图表文件：{charts:,} 个（共出现 {occurrences:,} 次）")
+    print(f"  • 占用空间：{total_bytes / 1024 / 1024:.1f} MB")
+    print(f"  • 跨文档重复的图片：{shared} 种")
+    print()
+    for row in conn.execute("SELECT type, COUNT(*) FROM charts GROUP BY type ORDER BY type"):
+        print(f"  {row[0]:<10}{row[1]:>8,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图表清单数据库：导入和查询')
+    parser.add_argument('db_path', help='SQLite数据库路径')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='导入已有的 charts_manifest.json')
+    import_parser.add_argument('pdf_path', help='图表所属的PDF文件路径')
+    import_parser.add_argument('charts_dir', help='包含 charts_manifest.json 的图表目录')
+
+    query_parser = subparsers.add_parser('query', help='查询图表')
+    query_parser.add_argument('--document', help='按PDF路径过滤（部分匹配）')
+    query_parser.add_argument('--page', type=int, help='出现在指定页码')
+    query_parser.add_argument('--type', dest='chart_type',
+                             choices=['embedded', 'figure', 'full_page'], help='图表类型')
+    query_parser.add_argument('--hash', dest='chart_hash', help='内容哈希（前缀匹配）')
+    query_parser.add_argument('--min-width', type=int, help='最小像素宽度')
+    query_parser.add_argument('--min-height', type=int, help='最小像素高度')
+    query_parser.add_argument('--limit', type=int, help='最多返回的条数')
+    query_parser.add_argument('--json', action='store_true', help='输出JSON格式')
+
+    subparsers.add_parser('summary', help='显示数据库概况')
+
+    args = parser.parse_args()
+
+    try:
+        conn = open_db(args.db_path)
+
+        if args.command == 'import':
+            charts_dir = Path(args.charts_dir)
+            if not (charts_dir / "charts_manifest.json").exists():
+                print(f"❌ 错误：找不到清单文件：{charts_dir / 'charts_manifest.json'}")
+                sys.exit(1)
+            count = index_manifest(conn, args.pdf_path, charts_dir)
+            print(f"✅ 已导入 {count} 个图表到 {args.db_path}")
+
+        elif args.command == 'query':
+            rows = query_charts(
+                conn, document=args.document, page=args.page, chart_type=args.chart_type,
+                chart_hash=args.chart_hash, min_width=args.min_width,
+                min_height=args.min_height, limit=args.limit)
+            if args.json:
+                print(json.dumps(rows, indent=2, ensure_ascii=False))
+            else:
+                for row in rows:
+                    path = Path(row['charts_dir']) / row['filename']
+                    print(f"  • 第{row['page']}页 {row['type']:<9}{row['width']}x{row['height']}"
+                          f"  ×{row['occurrences']}  {path}")
+                print(f"\n共 {len(rows)} 条")
+
+        else:
+            print_db_summary(conn)
+
+        conn.close()
+
+    except sqlite3.Error as e:
+        print(f"❌ 数据库错误：{e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,24 +4,74 @@
 准确统计中文文章字数（包括中英文）
 """
 
+import os
 import sys
+import glob
+import json
+import time
+import hashlib
 import argparse
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from text_stats import CJK_CLASS, LATIN_CLASS, count_chinese_chars, count_english_words, is_cjk
 
-def count_chinese_chars(text):
-    """统计中文字符数"""
-    return sum(1 for char in text if '\u4e00' <= char <= '\u9fff')
 
+# 句子：句末标点之间至少含一个非空白字符的片段
+SENTENCE_RE = re.compile(r'[^。！？.!?\S]*[^。！？.!?\s][^。！？.!?]*')
+SENTENCE_END_MARKS = '。！？.!?'
+SENTENCE_END_RE = re.compile(r'[。！？.!?]')
 
-def count_english_words(text):
-    """统计英文单词数"""
-    # 移除中文字符
-    text_without_chinese = re.sub(r'[\u4e00-\u9fff]', ' ', text)
-    # 按空格和标点分割
-    words = re.findall(r'\b[a-zA-Z]+\b', text_without_chinese)
-    return len(words)
+# 流式统计每次读取的字符数
+CHUNK_SIZE = 1 << 20
+
+# 多文件统计时求和的字段，以及报告的总字数百分位
+SUMMED_FIELDS = ('chinese_chars', 'english_words', 'total_words',
+                 'paragraphs', 'sentences', 'total_chars')
+PERCENTILES = (50, 90, 95, 99)
+
+# 章节切分用的标题行（与Markdown清理规则一致：#后必须跟空白）
+SECTION_HEADING_RE = re.compile(r'(#+)\s')
+# --watch 未指定 --target 时使用的目标字数（标准版）
+DEFAULT_TARGET = '6000-8000'
+
+
+# 行首的标题标记（先匹配字面的#再回看行首）
+HEADING_RE = re.compile(r'#(?<![^\n]#)#*\s+')
+# 以空标题结尾：整篇处理时标题后的 \s+ 会继续吞掉下一块开头的空白
+HEADING_AT_END_RE = re.compile(r'#(?<![^\n]#)#*\s+\Z')
+
+
+def _keep_text(match):
+    return match.group(1)
+
+
+# Markdown清理规则：(文本中必须出现的片段, 正则, 替换)，按顺序依次执行
+# 文本中不含该片段时整条规则跳过；标题和分隔线先匹配字面字符再回看行首，避免逐位置尝试 ^
+MARKDOWN_RULES = [
+    # 代码块
+    ('```', re.compile(r'```[\s\S]*?```'), ''),
+    # 行内代码
+    ('`', re.compile(r'`[^`]+`'), ''),
+    # 图片
+    ('![', re.compile(r'!\[([^\]]*)\]\([^\)]+\)'), ''),
+    # 链接保留文字
+    ('](', re.compile(r'\[([^\]]+)\]\([^\)]+\)'), _keep_text),
+    # 标题标记
+    ('#', HEADING_RE, ''),
+    # 粗体、斜体标记
+    ('**', re.compile(r'\*\*([^\*]+)\*\*'), _keep_text),
+    ('*', re.compile(r'\*([^\*]+)\*'), _keep_text),
+    ('__', re.compile(r'__([^_]+)__'), _keep_text),
+    ('_', re.compile(r'_([^_]+)_'), _keep_text),
+    # HTML标签
+    ('<', re.compile(r'<[^>]+>'), ''),
+    # 分隔线
+    ('---', re.compile(r'-(?<![^\n]-)-{2,}(?![^\n])'), ''),
+    ('═══', re.compile(r'═(?<![^\n]═)═{2,}(?![^\n])'), ''),
+]
 
 
 def count_paragraphs(text):
@@ -33,101 +83,573 @@ def count_paragraphs(text):
 def count_sentences(text):
     """统计句子数"""
     # 简单统计：按中英文句号、问号、感叹号分割
-    sentences = re.split(r'[。！？.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return len(sentences)
+    return len(SENTENCE_RE.findall(text))
 
 
 def remove_markdown_syntax(text):
     """移除Markdown语法，只保留正文"""
-    # 移除代码块
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    # 移除行内代码
-    text = re.sub(r'`[^`]+`', '', text)
-    # 移除图片
-    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', '', text)
-    # 移除链接但保留文字
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    # 移除标题标记
-    text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-    # 移除粗体、斜体标记
-    text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
-    text = re.sub(r'\*([^\*]+)\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    # 移除HTML标签
-    text = re.sub(r'<[^>]+>', '', text)
-    # 移除分隔线
-    text = re.sub(r'^-{3,}$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^═{3,}$', '', text, flags=re.MULTILINE)
+    for marker, pattern, replacement in MARKDOWN_RULES:
+        if marker in text:
+            text = pattern.sub(replacement, text)
 
     return text
 
 
-def analyze_text(file_path, remove_markdown=True):
-    """分析文本文件"""
+class TextCounter:
+    """按段落块累计统计，用于流式统计大文件
+
+    每块必须在空行处切开（见 iter_text_blocks），这样行首规则和字数都可以逐块相加；
+    段落和句子可能跨块，分别保留上一块末尾未结束的段落和句子状态。
+
+    只喂一块时与 compute_stats 完全相同。分多块时，跨空行成对的 * / _ 强调标记，
+    以及空标题后紧跟只剩空白的段落等少见写法，计数可能与整篇统计略有差别。
+    """
+
+    def __init__(self, remove_markdown=True):
+        self.remove_markdown = remove_markdown
+        self.chinese_chars = 0
+        self.english_words = 0
+        self.paragraphs = 0
+        self.sentences = 0
+        self.total_chars = 0
+        self.total_chars_original = 0
+        self._open_sentence = False
+        self._paragraph_tail = ''
+        self._heading_open = False
+
+    def _strip_markdown(self, block):
+        """与 remove_markdown_syntax 相同，但处理跨块的空标题"""
+        for marker, pattern, replacement in MARKDOWN_RULES:
+            if pattern is HEADING_RE:
+                if self._heading_open:
+                    block = block.lstrip()
+                    if not block:
+                        continue
+                self._heading_open = bool(HEADING_AT_END_RE.search(block))
+            if marker in block:
+                block = pattern.sub(replacement, block)
+
+        return block
+
+    def feed(self, block):
+        """累计一个文本块"""
+        self.total_chars_original += len(block)
+
+        if self.remove_markdown:
+            block = self._strip_markdown(block)
+
+        self.chinese_chars += count_chinese_chars(block)
+        self.english_words += count_english_words(block)
+        self.total_chars += len(block)
+
+        # 段落：上一块最后一个空行之后的内容与本块拼接后再切分
+        paragraphs = (self._paragraph_tail + block).split('\n\n')
+        self._paragraph_tail = paragraphs.pop()
+        self.paragraphs += sum(1 for p in paragraphs if p.strip())
+
+        # 上一块末尾的句子和本块开头的句子其实是同一句，不重复计数
+        sentences = count_sentences(block)
+        first_end = SENTENCE_END_RE.search(block)
+        head = block[:first_end.start()] if first_end else block
+        if self._open_sentence and head and not head.isspace():
+            sentences -= 1
+        self.sentences += sentences
+
+        if first_end:
+            last_end = max(block.rfind(mark) for mark in SENTENCE_END_MARKS)
+            tail = block[last_end + 1:]
+            self._open_sentence = bool(tail) and not tail.isspace()
+        elif block and not block.isspace():
+            self._open_sentence = True
+
+    def result(self):
+        """返回与 compute_stats 相同格式的统计字典"""
+        total_words = self.chinese_chars + self.english_words
+        paragraphs = self.paragraphs + (1 if self._paragraph_tail.strip() else 0)
+
+        # 估算阅读时间（中文约300字/分钟）
+        reading_time_min = total_words / 300
+        reading_time_max = total_words / 250
+
+        return {
+            'chinese_chars': self.chinese_chars,
+            'english_words': self.english_words,
+            'total_words': total_words,
+            'paragraphs': paragraphs,
+            'sentences': self.sentences,
+            'total_chars': self.total_chars,
+            'total_chars_original': self.total_chars_original,
+            'reading_time_min': reading_time_min,
+            'reading_time_max': reading_time_max,
+        }
+
+
+def compute_stats(text, remove_markdown=True):
+    """计算文本的各项统计指标"""
+    counter = TextCounter(remove_markdown)
+    counter.feed(text)
+    return counter.result()
+
+
+def _find_block_break(buffer):
+    """找buffer中最后一个可切分的位置：空行之后的非空白字符处，且不在代码块内
+
+    找不到时返回-1。
+    """
+    end = len(buffer)
+    pos = buffer.rfind('\n\n')
+    while pos != -1:
+        cut = pos + 2
+        while cut < end and buffer[cut] == '\n':
+            cut += 1
+
+        # 下一行以空白开头时，行首判断和标题后的 \s+ 可能跨块，换一个切分点
+        if cut < end and not buffer[cut].isspace():
+            if buffer.count('```', 0, cut) % 2 == 0:
+                return cut
+            # 切分点落在未闭合的代码块内，退到代码块开始之前
+            pos = buffer.rfind('\n\n', 0, buffer.rfind('```', 0, cut))
+        else:
+            pos = buffer.rfind('\n\n', 0, pos)
+
+    return -1
+
+
+def iter_text_blocks(f, chunk_size=CHUNK_SIZE):
+    """按块读取文本文件，每块都在段落边界处结束
+
+    遇到未闭合的代码块或超长段落时继续读下一块，内存占用取决于最长的段落/代码块，与文件大小无关。
+    """
+    buffer = ''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+
+        cut = _find_block_break(buffer)
+        if cut > 0:
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+
+    if buffer:
+        yield buffer
+
+
+def analyze_text(file_path, remove_markdown=True, stream=False, chunk_size=CHUNK_SIZE):
+    """分析文本文件
+
+    stream 为True时按块流式统计，内存占用与文件大小无关，
+    但少数跨段落的Markdown写法计数可能与整篇统计略有差别（见 TextCounter）。
+    """
     with open(file_path, 'r', encoding='utf-8') as f:
-        text = f.read()
+        if not stream:
+            return compute_stats(f.read(), remove_markdown)
+
+        counter = TextCounter(remove_markdown)
+        for block in iter_text_blocks(f, chunk_size):
+            counter.feed(block)
 
+    return counter.result()
+
+
+def compute_stats_reference(text, remove_markdown=True):
+    """逐条re.sub再逐项扫描的原始实现，仅供基准测试核对结果"""
     original_text = text
 
     if remove_markdown:
-        text = remove_markdown_syntax(text)
+        text = re.sub(r'```[\s\S]*?```', '', text)
+        text = re.sub(r'`[^`]+`', '', text)
+        text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', '', text)
+        text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+        text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
+        text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
+        text = re.sub(r'\*([^\*]+)\*', r'\1', text)
+        text = re.sub(r'__([^_]+)__', r'\1', text)
+        text = re.sub(r'_([^_]+)_', r'\1', text)
+        text = re.sub(r'<[^>]+>', '', text)
+        text = re.sub(r'^-{3,}$', '', text, flags=re.MULTILINE)
+        text = re.sub(r'^═{3,}$', '', text, flags=re.MULTILINE)
 
-    # 统计各项指标
-    chinese_chars = count_chinese_chars(text)
-    english_words = count_english_words(text)
+    chinese_chars = sum(1 for char in text if is_cjk(char))
+    text_without_chinese = re.sub(f'[{CJK_CLASS}]', ' ', text)
+    english_words = len(re.findall(f'\\b[{LATIN_CLASS}]+\\b', text_without_chinese))
     total_words = chinese_chars + english_words
-    paragraphs = count_paragraphs(text)
-    sentences = count_sentences(text)
-    total_chars = len(text)
-    total_chars_original = len(original_text)
-
-    # 估算阅读时间（中文约300字/分钟）
-    reading_time_min = total_words / 300
-    reading_time_max = total_words / 250
+    sentences = [s.strip() for s in re.split(r'[。！？.!?]+', text) if s.strip()]
 
     return {
         'chinese_chars': chinese_chars,
         'english_words': english_words,
         'total_words': total_words,
-        'paragraphs': paragraphs,
-        'sentences': sentences,
-        'total_chars': total_chars,
-        'total_chars_original': total_chars_original,
-        'reading_time_min': reading_time_min,
-        'reading_time_max': reading_time_max,
+        'paragraphs': len([p.strip() for p in text.split('\n\n') if p.strip()]),
+        'sentences': len(sentences),
+        'total_chars': len(text),
+        'total_chars_original': len(original_text),
+        'reading_time_min': total_words / 300,
+        'reading_time_max': total_words / 250,
     }
 
 
+def run_benchmark(file_path, remove_markdown=True, repeat=3):
+    """对比原始实现与当前实现的耗时，并核对两者结果完全一致"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    print(f"⏱️  基准测试：{file_path}（{len(text.encode('utf-8')) / 1024 / 1024:.1f} MB，取{repeat}次最快）")
+    timings = {}
+    results = {}
+    for name, func in (('原始实现', compute_stats_reference), ('当前实现', compute_stats)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[name] = func(text, remove_markdown)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+
+    print("─" * 60)
+    for name, elapsed in timings.items():
+        print(f"  {name}：{elapsed:.3f} 秒")
+    print(f"  加速比：  {timings['原始实现'] / timings['当前实现']:.2f}x")
+    print("─" * 60)
+
+    mismatched = [k for k in results['原始实现'] if results['原始实现'][k] != results['当前实现'][k]]
+    if mismatched:
+        print(f"❌ 结果不一致：{', '.join(mismatched)}")
+        return False
+    print("✓ 各项统计结果完全一致")
+    return True
+
+
 def format_number(num):
     """格式化数字，添加千位分隔符"""
     return f"{num:,}"
 
 
+def collect_files(inputs):
+    """把目录、通配符和文件路径展开成去重后的文件列表（目录取其中的 .md/.txt）"""
+    file_paths = []
+    seen = set()
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob('*.md')) + sorted(path.glob('*.txt'))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in sorted(glob.glob(item, recursive=True))]
+
+        for match in matches:
+            resolved = match.resolve()
+            if match.is_file() and resolved not in seen:
+                seen.add(resolved)
+                file_paths.append(match)
+
+    return file_paths
+
+
+def count_file(file_path, remove_markdown=True, stream=False, chunk_size=CHUNK_SIZE):
+    """在工作进程中统计一个文件，失败时记录错误而不是抛出"""
+    result = {'file': str(file_path), 'error': None}
+    try:
+        result.update(analyze_text(file_path, remove_markdown, stream, chunk_size))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def percentile(sorted_values, pct):
+    """线性插值计算百分位数，sorted_values 须已排序"""
+    if not sorted_values:
+        return 0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize_results(results):
+    """汇总多个文件的统计：合计值和总字数的百分位分布"""
+    succeeded = [r for r in results if not r['error']]
+
+    totals = {key: sum(r[key] for r in succeeded) for key in SUMMED_FIELDS}
+
+    words = sorted(r['total_words'] for r in succeeded)
+    distribution = {'min': words[0] if words else 0, 'max': words[-1] if words else 0}
+    for pct in PERCENTILES:
+        distribution[f'p{pct}'] = round(percentile(words, pct), 1)
+
+    return {
+        'total_files': len(results),
+        'failed': len(results) - len(succeeded),
+        'totals': totals,
+        'total_words_percentiles': distribution,
+        'files': results,
+    }
+
+
+def count_files_parallel(file_paths, remove_markdown=True, stream=False,
+                         chunk_size=CHUNK_SIZE, workers=None):
+    """并行统计多个文件，按输入顺序返回每个文件的结果"""
+    workers = workers or os.cpu_count() or 1
+    task = partial(count_file, remove_markdown=remove_markdown,
+                   stream=stream, chunk_size=chunk_size)
+
+    if workers == 1 or len(file_paths) == 1:
+        return [task(path) for path in file_paths]
+
+    # 成批分发，避免上千个小文件逐个往返进程
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, file_paths, chunksize=chunksize))
+
+
+def print_summary(summary, elapsed):
+    """打印多文件统计汇总表"""
+    print()
+    print("=" * 78)
+    print(f"  {'文件':<36}{'中文字符':>10}{'英文单词':>10}{'总字数':>10}{'段落':>8}")
+    print("-" * 78)
+    for r in summary['files']:
+        name = r['file']
+        if len(name) > 34:
+            name = '...' + name[-31:]
+        if r['error']:
+            print(f"  {name:<36}  ❌ {r['error']}")
+            continue
+        print(f"  {name:<36}{r['chinese_chars']:>10,}{r['english_words']:>10,}"
+              f"{r['total_words']:>10,}{r['paragraphs']:>8,}")
+    print("-" * 78)
+    totals = summary['totals']
+    print(f"  {'合计':<36}{totals['chinese_chars']:>10,}{totals['english_words']:>10,}"
+          f"{totals['total_words']:>10,}{totals['paragraphs']:>8,}")
+    print("=" * 78)
+    print()
+
+    distribution = summary['total_words_percentiles']
+    print("📈 总字数分布：")
+    print(f"  • 最少：{format_number(distribution['min'])}  最多：{format_number(distribution['max'])}")
+    print("  • " + "  ".join(f"P{pct}：{distribution[f'p{pct}']:,.0f}" for pct in PERCENTILES))
+    print()
+    print(f"✅ 统计 {summary['total_files'] - summary['failed']} 个文件，耗时 {elapsed:.2f} 秒")
+    if summary['failed']:
+        print(f"❌ 失败：{summary['failed']} 个")
+
+
+def split_sections(text):
+    """按标题行把文章切成章节，返回 [(标题, 级别, 章节原文), ...]
+
+    代码块中的 # 不算标题；各章节原文首尾相接即为全文，字数可以逐章相加。
+    """
+    sections = []
+    title, level, lines = '（开头）', 0, []
+    in_fence = False
+
+    for line in text.splitlines(keepends=True):
+        heading = None if in_fence else SECTION_HEADING_RE.match(line)
+        if heading:
+            if lines:
+                sections.append((title, level, ''.join(lines)))
+            title = line.strip().lstrip('#').strip() or '（无标题）'
+            level = len(heading.group(1))
+            lines = []
+        lines.append(line)
+        if line.count('```') % 2:
+            in_fence = not in_fence
+
+    if lines:
+        sections.append((title, level, ''.join(lines)))
+
+    return sections
+
+
+def section_stats(sections, cache, remove_markdown=True):
+    """统计每个章节，内容未变的章节直接取缓存
+
+    cache 为 {内容哈希: 统计结果} 字典，跨多次调用复用；调用后只保留当前文章用到的章节，
+    长时间编辑也不会无限增长。返回 (各章节统计, 重新计算的章节数)。
+    """
+    rows = []
+    recomputed = 0
+    used = {}
+    for title, level, section_text in sections:
+        key = hashlib.sha1(section_text.encode('utf-8')).hexdigest()
+        stats = cache.get(key)
+        if stats is None:
+            stats = compute_stats(section_text, remove_markdown)
+            recomputed += 1
+        used[key] = stats
+        rows.append((title, level, stats))
+
+    cache.clear()
+    cache.update(used)
+    return rows, recomputed
+
+
+def parse_target(spec):
+    """解析目标字数："6000-8000" 返回 (6000, 8000)，"7000" 返回 (7000, None)"""
+    try:
+        if '-' in spec:
+            low, high = spec.split('-', 1)
+            return int(low), int(high)
+        return int(spec), None
+    except ValueError:
+        raise ValueError(f"无效的目标字数：{spec}（示例：6000-8000）")
+
+
+def format_target_status(total_words, target):
+    """返回当前字数相对目标的说明"""
+    low, high = target
+    if total_words < low:
+        return f"⏳ 还差 {format_number(low - total_words)} 字达到下限 {format_number(low)}"
+    if high is not None and total_words > high:
+        return f"⚠️  超出上限 {format_number(high)} 共 {format_number(total_words - high)} 字"
+    return "✅ 已在目标范围内"
+
+
+def print_section_report(file_path, rows, target, recomputed):
+    """打印分章节字数和目标进度"""
+    total_words = sum(stats['total_words'] for _, _, stats in rows)
+    low, high = target
+
+    print("=" * 60)
+    print(f"  文件：{Path(file_path).name}    {time.strftime('%H:%M:%S')}")
+    print("=" * 60)
+    for title, level, stats in rows:
+        name = '  ' * max(level - 1, 0) + title
+        if len(name) > 36:
+            name = name[:35] + '…'
+        print(f"  {name:<38}{stats['total_words']:>8,} 字")
+    print("-" * 60)
+
+    # 进度条以上限（没有上限时以下限）为满格
+    goal = high or low
+    filled = min(int(total_words / goal * 30), 30) if goal else 30
+    target_text = f"{format_number(low)}-{format_number(high)}" if high else f"≥{format_number(low)}"
+    print(f"  总字数：{format_number(total_words)} / {target_text}")
+    print(f"  [{'█' * filled}{'░' * (30 - filled)}] {total_words / goal * 100 if goal else 100:.0f}%")
+    print(f"  {format_target_status(total_words, target)}")
+    print()
+    print(f"  共 {len(rows)} 节，本次重新统计 {recomputed} 节（Ctrl+C 退出）")
+
+
+def watch_file(file_path, target, remove_markdown=True, interval=1.0):
+    """监视文件变化，每次保存后只重新统计改动过的章节"""
+    cache = {}
+    last_state = None
+
+    try:
+        while True:
+            try:
+                stat = Path(file_path).stat()
+                state = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                # 编辑器保存时可能先删除再写入，稍后重试
+                state = None
+
+            if state is not None and state != last_state:
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                except (FileNotFoundError, UnicodeDecodeError):
+                    # 读到一半被删除或正在写入（多字节字符被截断），下次轮询再读
+                    time.sleep(interval)
+                    continue
+                last_state = state
+
+                rows, recomputed = section_stats(split_sections(text), cache, remove_markdown)
+
+                print("\033[2J\033[H", end='')  # 清屏
+                print_section_report(file_path, rows, target, recomputed)
+
+            time.sleep(interval)
+
+    except KeyboardInterrupt:
+        print()
+        print("👋 已停止监视")
+
+
 def main():
     parser = argparse.ArgumentParser(description='统计中文文章字数')
-    parser.add_argument('file_path', help='文本文件路径')
+    parser.add_argument('file_paths', nargs='+',
+                       help='文本文件路径；也可以是多个文件、目录或通配符（如 "articles/**/*.md"）')
     parser.add_argument('--keep-markdown', action='store_true',
                        help='保留Markdown语法（不移除）')
     parser.add_argument('--json', action='store_true',
                        help='以JSON格式输出')
+    parser.add_argument('--stream', action='store_true',
+                       help='按块流式统计，内存占用与文件大小无关'
+                            '（跨空行的强调标记等少见写法计数可能与整篇统计略有差别）')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                       help=f'流式统计每次读取的字符数（默认：{CHUNK_SIZE}）')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='统计多个文件时的并行进程数（默认：CPU核数）')
+    parser.add_argument('--target',
+                       help=f'目标字数范围，如 6000-8000（--watch 默认：{DEFAULT_TARGET}）')
+    parser.add_argument('--watch', action='store_true',
+                       help='监视文件，每次保存后按章节增量统计并对照目标字数')
+    parser.add_argument('--interval', type=float, default=1.0,
+                       help='--watch 检查文件变化的间隔秒数（默认：1）')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='对比原始实现与当前实现的耗时并核对结果')
 
     args = parser.parse_args()
 
+    # 多个文件、目录或通配符：并行统计并汇总
+    first = args.file_paths[0]
+    if len(args.file_paths) > 1 or Path(first).is_dir() or any(c in first for c in '*?['):
+        file_paths = collect_files(args.file_paths)
+        if not file_paths:
+            print("❌ 错误：没有找到要统计的文件")
+            sys.exit(1)
+
+        start = time.perf_counter()
+        results = count_files_parallel(
+            file_paths, remove_markdown=not args.keep_markdown, stream=args.stream,
+            chunk_size=args.chunk_size, workers=args.workers)
+        summary = summarize_results(results)
+
+        if args.json:
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+        else:
+            print_summary(summary, time.perf_counter() - start)
+
+        if summary['failed']:
+            sys.exit(1)
+        return
+
     # 检查文件
-    file_path = Path(args.file_path)
+    file_path = Path(args.file_paths[0])
     if not file_path.exists():
         print(f"❌ 错误：找不到文件：{file_path}")
         sys.exit(1)
 
+    target = None
+    if args.target or args.watch:
+        try:
+            target = parse_target(args.target or DEFAULT_TARGET)
+        except ValueError as e:
+            print(f"❌ 错误：{e}")
+            sys.exit(1)
+
+    if args.watch:
+        watch_file(file_path, target, remove_markdown=not args.keep_markdown,
+                   interval=args.interval)
+        return
+
+    if args.benchmark:
+        if not run_benchmark(file_path, remove_markdown=not args.keep_markdown):
+            sys.exit(1)
+        return
+
     try:
         # 分析文本
-        stats = analyze_text(file_path, remove_markdown=not args.keep_markdown)
+        stats = analyze_text(file_path, remove_markdown=not args.keep_markdown,
+                             stream=args.stream, chunk_size=args.chunk_size)
 
         if args.json:
             # JSON格式输出
-            import json
             print(json.dumps(stats, indent=2, ensure_ascii=False))
         else:
             # 友好格式输出
@@ -140,6 +662,8 @@ def main():
             print(f"  • 中文字符：{format_number(stats['chinese_chars'])} 字")
             print(f"  • 英文单词：{format_number(stats['english_words'])} 词")
             print(f"  • 总字数：{format_number(stats['total_words'])} 字")
+            if target:
+                print(f"  • 目标字数：{format_target_status(stats['total_words'], target)}")
             print()
             print("📝 结构统计：")
             print(f"  • 段落数：{format_number(stats['paragraphs'])} 段")
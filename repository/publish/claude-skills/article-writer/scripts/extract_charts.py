@@ -4,22 +4,394 @@ PDF图表提取脚本
 从PDF文档中提取所有图片和图表
 """
 
+import os
+import re
 import sys
+import time
+import uuid
+import hashlib
 import argparse
 import json
+import tempfile
 from pathlib import Path
 
+from extract_text import parse_page_ranges
+
 try:
     import pdfplumber
+    from pdfminer.pdftypes import resolve1
     from PIL import Image
-    import io
     LIBRARIES_AVAILABLE = True
 except ImportError:
     LIBRARIES_AVAILABLE = False
 
 
-def extract_images_from_pdf(pdf_path, output_dir):
-    """从PDF提取所有图片"""
+# 这些编码本身就是图片文件格式，直接写出原始数据，不解码
+PASSTHROUGH_FILTERS = {
+    'DCTDecode': 'jpg',
+    'DCT': 'jpg',
+    'JPXDecode': 'jp2',
+}
+
+# pdfminer无法还原成像素数据的编码，改为渲染页面区域
+RENDER_ONLY_FILTERS = {'JBIG2Decode', 'CCITTFaxDecode', 'CCF'}
+
+# 色彩空间 -> PIL模式（8位）
+COLORSPACE_MODES = {
+    'DeviceGray': 'L', 'CalGray': 'L', 'G': 'L',
+    'DeviceRGB': 'RGB', 'CalRGB': 'RGB', 'RGB': 'RGB',
+    'DeviceCMYK': 'CMYK', 'CMYK': 'CMYK',
+}
+
+# 渲染页面区域时使用的分辨率
+RENDER_RESOLUTION = 150
+
+
+def _literal_name(obj):
+    """取PDF名字对象（如 /DCTDecode）的名称"""
+    obj = resolve1(obj)
+    return getattr(obj, 'name', obj)
+
+
+def _pil_mode(img):
+    """根据位深和色彩空间推断PIL模式，无法直接还原像素时返回None"""
+    bits = img.get('bits')
+    if img.get('imagemask') or bits == 1:
+        return '1'
+    if bits != 8:
+        return None
+
+    colorspace = img.get('colorspace') or []
+    if not colorspace:
+        return None
+    colorspace = resolve1(colorspace[0])
+
+    if isinstance(colorspace, list):
+        family = _literal_name(colorspace[0])
+        if family == 'ICCBased':
+            components = resolve1(colorspace[1]).get('N')
+            return {1: 'L', 3: 'RGB', 4: 'CMYK'}.get(components)
+        return COLORSPACE_MODES.get(family)
+
+    return COLORSPACE_MODES.get(_literal_name(colorspace))
+
+
+def _expected_size(mode, width, height):
+    """未压缩像素数据应有的字节数"""
+    if mode == '1':
+        return (width + 7) // 8 * height
+    return width * height * {'L': 1, 'RGB': 3, 'CMYK': 4}[mode]
+
+
+def _render_region(page, img, image_path):
+    """渲染图片在页面上的区域（用于无法直接还原的编码）"""
+    x0, top, x1, bottom = page.bbox
+    bbox = (
+        max(img['x0'], x0), max(img['top'], top),
+        min(img['x1'], x1), min(img['bottom'], bottom),
+    )
+    page_image = page.crop(bbox).to_image(resolution=RENDER_RESOLUTION)
+    page_image.save(image_path, format='PNG')
+    return page_image.original.size
+
+
+def image_digest(img):
+    """计算嵌入图片的内容哈希（基于图片流数据，不做图片解码）
+
+    同一个图片对象被多页引用时，pdfminer会复用已解开的数据，
+    所以统一对 get_data() 的结果取哈希，保证每次出现的哈希一致。
+    """
+    digest = hashlib.sha256(img['stream'].get_data())
+    width, height = img.get('srcsize') or (0, 0)
+    digest.update(f"{width}x{height}:{img.get('bits')}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def figure_digest(image):
+    """计算裁剪出的图表区域的内容哈希（基于像素数据）"""
+    digest = hashlib.sha256(image.tobytes())
+    digest.update(f"{image.mode}:{image.width}x{image.height}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def save_embedded_image(page, img, output_dir, base_name):
+    """把页面中的一张嵌入图片写入磁盘
+
+    JPEG/JPEG 2000 原样写出；其他编码解码成像素后存为PNG；
+    pdfminer无法解码的（JBIG2、CCITT、索引色等）改为渲染该区域。
+    返回 (文件名, 像素宽, 像素高, 写出方式)，写出方式为 passthrough/decoded/rendered。
+    """
+    stream = img['stream']
+    filters = [_literal_name(f) for f, _ in stream.get_filters()]
+    width, height = img.get('srcsize') or (0, 0)
+
+    if filters and filters[-1] in PASSTHROUGH_FILTERS:
+        image_name = f"{base_name}.{PASSTHROUGH_FILTERS[filters[-1]]}"
+        # get_data() 只解开外层的Flate等编码，不会解码JPEG本身
+        with open(output_dir / image_name, 'wb') as f:
+            f.write(stream.get_data())
+        return image_name, width, height, 'passthrough'
+
+    image_name = f"{base_name}.png"
+    image_path = output_dir / image_name
+
+    mode = _pil_mode(img)
+    if mode and width and height and not RENDER_ONLY_FILTERS.intersection(filters):
+        data = stream.get_data()
+        expected = _expected_size(mode, width, height)
+        if len(data) >= expected:
+            image = Image.frombytes(mode, (width, height), data[:expected])
+            if mode == 'CMYK':
+                image = image.convert('RGB')
+            image.save(image_path, 'PNG')
+            return image_name, width, height, 'decoded'
+
+    width, height = _render_region(page, img, image_path)
+    return image_name, width, height, 'rendered'
+
+
+def extract_page_images(page, page_num, output_dir, verbose=True, seen=None):
+    """提取单个pdfplumber页面中的图片，返回该页新写出的图表信息列表
+
+    seen 为 {内容哈希: 图表信息} 字典时按内容去重：重复出现的图片不再写文件，
+    只把本次出现的位置追加到首次写出那条记录的 occurrences 中。
+    """
+    charts_info = []
+
+    # 提取页面中的图片
+    if hasattr(page, 'images') and page.images:
+        for img_idx, img in enumerate(page.images, 1):
+            try:
+                bbox = [round(img['x0'], 2), round(img['top'], 2),
+                        round(img['x1'], 2), round(img['bottom'], 2)]
+                occurrence = {"page": page_num, "index": img_idx, "bbox": bbox}
+
+                digest = image_digest(img)
+                if seen is not None and digest in seen:
+                    seen[digest]["occurrences"].append(occurrence)
+                    continue
+
+                image_name, width, height, encoding = save_embedded_image(
+                    page, img, output_dir, f"page_{page_num}_image_{img_idx}")
+
+                # 记录图片信息
+                chart_info = {
+                    "page": page_num,
+                    "index": img_idx,
+                    "filename": image_name,
+                    "type": "embedded",
+                    "encoding": encoding,
+                    "width": width,
+                    "height": height,
+                    "bbox": bbox,
+                    "bytes": (output_dir / image_name).stat().st_size,
+                    "hash": digest,
+                    "occurrences": [occurrence],
+                }
+
+                if seen is not None:
+                    seen[digest] = chart_info
+                charts_info.append(chart_info)
+
+            except Exception as e:
+                if verbose:
+                    print(f"\n⚠️  警告：页面{page_num}图片{img_idx}提取失败：{e}")
+
+    return charts_info
+
+
+# 图表区域检测参数（单位：pt）
+FIGURE_MERGE_GAP = 12      # 相距小于该值的矢量对象合并为同一区域
+FIGURE_MIN_SIZE = 48       # 宽和高都至少这么大才算图表
+FIGURE_MIN_OBJECTS = 2     # 区域内至少包含的图形对象数（单张图片除外）
+FIGURE_PADDING = 4         # 裁剪时在区域四周留白
+
+
+def _boxes_touch(a, b, gap):
+    return (a[0] - gap <= b[2] and b[0] - gap <= a[2]
+            and a[1] - gap <= b[3] and b[1] - gap <= a[3])
+
+
+def _box_contains(outer, inner, tolerance=1):
+    return (outer[0] - tolerance <= inner[0] and outer[1] - tolerance <= inner[1]
+            and inner[2] <= outer[2] + tolerance and inner[3] <= outer[3] + tolerance)
+
+
+def _merge_regions(candidates, gap):
+    """把相互靠近的框合并成区域，返回的区域两两互不靠近
+
+    合并后的区域变大，可能碰到之前没碰到的区域，所以每个新框都反复合并到不再变化为止。
+    """
+    regions = []
+    for box, is_image in candidates:
+        merged = {'bbox': box, 'objects': 1, 'has_image': is_image}
+        changed = True
+        while changed:
+            changed = False
+            remaining = []
+            for region in regions:
+                if _boxes_touch(region['bbox'], merged['bbox'], gap):
+                    merged = {
+                        'bbox': (
+                            min(region['bbox'][0], merged['bbox'][0]),
+                            min(region['bbox'][1], merged['bbox'][1]),
+                            max(region['bbox'][2], merged['bbox'][2]),
+                            max(region['bbox'][3], merged['bbox'][3]),
+                        ),
+                        'objects': region['objects'] + merged['objects'],
+                        'has_image': region['has_image'] or merged['has_image'],
+                    }
+                    changed = True
+                else:
+                    remaining.append(region)
+            regions = remaining
+        regions.append(merged)
+    return regions
+
+
+def detect_figure_regions(page):
+    """根据页面的矢量对象和图片检测图表区域
+
+    把 rects/curves/lines/images 中相互靠近的对象合并成区域，去掉过小的区域
+    （下划线、表格边线等）、覆盖整页的背景框，以及完全落在一张嵌入图片内的区域
+    （这些图片已由 extract_page_images 原样写出，不再重复裁剪）。
+    返回 [{"bbox": (x0, top, x1, bottom), "objects": 对象数, "has_image": bool}, ...]
+    """
+    page_x0, page_top, page_x1, page_bottom = page.bbox
+    page_width = page_x1 - page_x0
+    page_height = page_bottom - page_top
+
+    candidates = []
+    for kind in ('rects', 'curves', 'lines', 'images'):
+        for obj in getattr(page, kind):
+            box = (obj['x0'], obj['top'], obj['x1'], obj['bottom'])
+            # 忽略整页背景和页面边框
+            if (box[2] - box[0]) > 0.9 * page_width and (box[3] - box[1]) > 0.9 * page_height:
+                continue
+            candidates.append((box, kind == 'images'))
+
+    regions = _merge_regions(candidates, FIGURE_MERGE_GAP)
+    image_boxes = [box for box, is_image in candidates if is_image]
+
+    figures = []
+    for region in regions:
+        x0, top, x1, bottom = region['bbox']
+        if x1 - x0 < FIGURE_MIN_SIZE or bottom - top < FIGURE_MIN_SIZE:
+            continue
+        if region['objects'] < FIGURE_MIN_OBJECTS and not region['has_image']:
+            continue
+        if any(_box_contains(box, region['bbox']) for box in image_boxes):
+            continue
+        figures.append(region)
+
+    figures.sort(key=lambda r: (r['bbox'][1], r['bbox'][0]))
+    return figures
+
+
+def extract_page_figures(page, page_num, output_dir, dpi=200, verbose=True, seen=None,
+                         figures=None):
+    """只渲染检测到图表的页面，并裁剪到各图表区域，返回该页新写出的图表信息列表
+
+    seen 与 extract_page_images 相同：内容相同的区域（如每页重复的页眉图表）只写出一次。
+    figures 为已检测出的区域（默认在这里检测）。
+    """
+    if figures is None:
+        figures = detect_figure_regions(page)
+    if not figures:
+        return []
+
+    charts_info = []
+    try:
+        # 每页只渲染一次，再按区域裁剪
+        page_image = page.to_image(resolution=dpi).original
+        scale = dpi / 72
+        page_x0, page_top, page_x1, page_bottom = page.bbox
+
+        for fig_idx, figure in enumerate(figures, 1):
+            x0, top, x1, bottom = figure['bbox']
+            x0 = max(x0 - FIGURE_PADDING, page_x0)
+            top = max(top - FIGURE_PADDING, page_top)
+            x1 = min(x1 + FIGURE_PADDING, page_x1)
+            bottom = min(bottom + FIGURE_PADDING, page_bottom)
+
+            crop = page_image.crop((
+                int((x0 - page_x0) * scale), int((top - page_top) * scale),
+                int(round((x1 - page_x0) * scale)), int(round((bottom - page_top) * scale)),
+            ))
+            bbox = [round(x0, 2), round(top, 2), round(x1, 2), round(bottom, 2)]
+            occurrence = {"page": page_num, "index": fig_idx, "bbox": bbox}
+
+            digest = figure_digest(crop)
+            if seen is not None and digest in seen:
+                seen[digest]["occurrences"].append(occurrence)
+                continue
+
+            image_name = f"page_{page_num}_figure_{fig_idx}.png"
+            crop.save(output_dir / image_name, 'PNG')
+
+            chart_info = {
+                "page": page_num,
+                "index": fig_idx,
+                "filename": image_name,
+                "type": "figure",
+                "width": crop.width,
+                "height": crop.height,
+                "bbox": bbox,
+                "objects": figure['objects'],
+                "bytes": (output_dir / image_name).stat().st_size,
+                "hash": digest,
+                "occurrences": [occurrence],
+            }
+
+            if seen is not None:
+                seen[digest] = chart_info
+            charts_info.append(chart_info)
+
+    except Exception as e:
+        if verbose:
+            print(f"\n⚠️  警告：页面{page_num}图表区域渲染失败：{e}")
+
+    return charts_info
+
+
+def extract_figures_from_pdf(pdf_path, output_dir, dpi=200, verbose=True, page_numbers=None,
+                             dedup=True):
+    """检测并裁剪所有页面中的图表区域，纯文字页面不做渲染
+
+    dedup 为True时内容相同的区域只写出一次。
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    charts_info = []
+    rendered_pages = 0
+    seen = {} if dedup else None
+
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
+        total_pages = len(pdf.pages)
+        for index, page in enumerate(pdf.pages, 1):
+            if verbose:
+                print(f"⏳ 检测第 {index}/{total_pages} 页...", end='\r')
+
+            figures = detect_figure_regions(page)
+            if figures:
+                rendered_pages += 1
+                charts_info.extend(extract_page_figures(
+                    page, page.page_number, output_dir, dpi, verbose, seen, figures))
+            page.close()
+
+        if verbose:
+            print()  # 换行
+            print(f"✓ {total_pages} 页中有 {rendered_pages} 页包含图表，仅渲染这些页面")
+
+    return charts_info
+
+
+def extract_images_from_pdf(pdf_path, output_dir, verbose=True, page_numbers=None, dedup=True):
+    """从PDF提取所有图片（page_numbers 指定页码列表，默认全部页面）
+
+    dedup 为True时内容相同的图片（logo、水印、页眉图等）只写出一次。
+    """
     if not LIBRARIES_AVAILABLE:
         print("❌ 错误：缺少必要的库")
         print("请运行：pip install pdfplumber Pillow pdf2image")
@@ -29,62 +401,168 @@ def extract_images_from_pdf(pdf_path, output_dir):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     charts_info = []
-    total_images = 0
+    seen = {} if dedup else None
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
         total_pages = len(pdf.pages)
-        print(f"📄 PDF总页数：{total_pages}")
+        if verbose:
+            print(f"📄 PDF总页数：{total_pages}")
+            print()
+
+        for index, page in enumerate(pdf.pages, 1):
+            if verbose:
+                print(f"⏳ 处理第 {index}/{total_pages} 页...", end='\r')
+
+            charts_info.extend(extract_page_images(
+                page, page.page_number, output_dir, verbose, seen))
+            page.close()
+
+        if verbose:
+            print()  # 换行
+
+    return charts_info, len(charts_info)
+
+
+def _contiguous_ranges(page_numbers):
+    """把升序页码列表拆成连续区间 [(起始页, 结束页), ...]"""
+    ranges = []
+    for page_num in page_numbers:
+        if ranges and ranges[-1][1] == page_num - 1:
+            ranges[-1][1] = page_num
+        else:
+            ranges.append([page_num, page_num])
+    return [tuple(r) for r in ranges]
+
+
+def render_full_pages(pdf_path, output_dir, total_pages=None, dpi=200,
+                      page_numbers=None, workers=None, verbose=True):
+    """将页面转为完整图片（需要pdf2image和poppler），返回图表信息列表
+
+    每个连续页码区间只调用一次pdftoppm，并按 workers 拆给多个pdftoppm进程并行渲染，
+    图片由poppler直接写入输出目录，不经过内存中的PIL对象。
+    total_pages 未知时用poppler的pdfinfo读取，不再为数页数而重新解析整个PDF。
+    """
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if page_numbers is None:
+        if total_pages is None:
+            total_pages = pdfinfo_from_path(pdf_path)['Pages']
+        page_numbers = list(range(1, total_pages + 1))
+    workers = workers or os.cpu_count() or 1
+
+    charts_info = []
+    for first_page, last_page in _contiguous_ranges(page_numbers):
+        if verbose:
+            print(f"⏳ 渲染第 {first_page}-{last_page} 页（{workers} 个进程）...", end='\r')
+
+        # 临时文件名前缀，避免与同目录下的其他渲染任务冲突
+        prefix = f".render_{uuid.uuid4().hex[:8]}_"
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            output_folder=str(output_dir),
+            output_file=prefix,
+            fmt='png',
+            thread_count=min(workers, last_page - first_page + 1),
+            paths_only=True,
+        )
+
+        # pdftoppm输出的文件名形如 <前缀>0001-07.png，按页码重命名
+        for path in paths:
+            page_num = int(re.search(r'-(\d+)\.png$', path).group(1))
+            image_name = f"page_{page_num}_full.png"
+            image_path = output_dir / image_name
+            os.replace(path, image_path)
+
+            # 只读取PNG文件头获取尺寸
+            with Image.open(image_path) as image:
+                width, height = image.size
+
+            # 添加到清单
+            charts_info.append({
+                "page": page_num,
+                "index": 0,
+                "filename": image_name,
+                "type": "full_page",
+                "width": width,
+                "height": height,
+            })
+
+    if verbose:
         print()
 
-        for page_num, page in enumerate(pdf.pages, 1):
-            print(f"⏳ 处理第 {page_num}/{total_pages} 页...", end='\r')
-
-            # 提取页面中的图片
-            if hasattr(page, 'images') and page.images:
-                for img_idx, img in enumerate(page.images, 1):
-                    try:
-                        # 尝试提取图片
-                        # pdfplumber的图片提取比较简单，实际项目中可能需要更复杂的处理
-                        image_name = f"page_{page_num}_image_{img_idx}.png"
-                        image_path = output_dir / image_name
-
-                        # 记录图片信息
-                        chart_info = {
-                            "page": page_num,
-                            "index": img_idx,
-                            "filename": image_name,
-                            "width": img.get('width', 0),
-                            "height": img.get('height', 0),
-                        }
-
-                        charts_info.append(chart_info)
-                        total_images += 1
-
-                    except Exception as e:
-                        print(f"\n⚠️  警告：页面{page_num}图片{img_idx}提取失败：{e}")
-
-            # 另一种方法：将整个页面转为图片（适用于复杂图表）
-            # 如果需要，可以使用pdf2image库
-            # try:
-            #     from pdf2image import convert_from_path
-            #     images = convert_from_path(pdf_path, first_page=page_num, last_page=page_num)
-            #     if images:
-            #         image_path = output_dir / f"page_{page_num}_full.png"
-            #         images[0].save(image_path, 'PNG')
-            # except ImportError:
-            #     pass
-
-        print()  # 换行
-
-    return charts_info, total_images
+    charts_info.sort(key=lambda c: c['page'])
+    return charts_info
+
+
+def render_full_pages_per_page(pdf_path, output_dir, page_numbers, dpi=200):
+    """旧的逐页渲染方式：每页启动一次pdftoppm并在内存中保存PIL图片，仅用于基准对比"""
+    from pdf2image import convert_from_path
+
+    output_dir = Path(output_dir)
+    for page_num in page_numbers:
+        images = convert_from_path(
+            pdf_path,
+            first_page=page_num,
+            last_page=page_num,
+            dpi=dpi
+        )
+        if images:
+            images[0].save(output_dir / f"page_{page_num}_full.png", 'PNG')
+
+
+def run_raster_benchmark(pdf_path, page_numbers, dpi=200, workers=None):
+    """对比逐页渲染与单次并行渲染的耗时"""
+    print("⏱️  整页渲染基准测试")
+    print(f"  页数：{len(page_numbers)}，DPI：{dpi}")
+    print("─" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        per_page_dir = Path(tmp_dir) / 'per_page'
+        per_page_dir.mkdir()
+        start = time.perf_counter()
+        render_full_pages_per_page(pdf_path, per_page_dir, page_numbers, dpi)
+        per_page_time = time.perf_counter() - start
+
+        batch_dir = Path(tmp_dir) / 'batch'
+        start = time.perf_counter()
+        render_full_pages(pdf_path, batch_dir, dpi=dpi, page_numbers=page_numbers,
+                          workers=workers, verbose=False)
+        batch_time = time.perf_counter() - start
+
+    speedup = per_page_time / batch_time if batch_time > 0 else 0
+    print(f"  逐页渲染（旧）：{per_page_time:.2f} 秒")
+    print(f"  单次并行渲染：  {batch_time:.2f} 秒（{workers or os.cpu_count()} 个进程）")
+    print(f"  加速比：        {speedup:.2f}x")
+    print("─" * 60)
+
+
+def dedup_summary(charts_info):
+    """统计去重效果，返回 (图片出现总次数, 跳过的重复次数, 节省的字节数)"""
+    occurrences = 0
+    duplicates = 0
+    saved_bytes = 0
+    for chart in charts_info:
+        count = len(chart.get('occurrences', [chart]))
+        occurrences += count
+        duplicates += count - 1
+        saved_bytes += chart.get('bytes', 0) * (count - 1)
+    return occurrences, duplicates, saved_bytes
 
 
 def save_charts_manifest(charts_info, output_dir):
     """保存图表清单JSON文件"""
-    manifest_path = output_dir / "charts_manifest.json"
+    manifest_path = Path(output_dir) / "charts_manifest.json"
 
+    occurrences, duplicates, _ = dedup_summary(charts_info)
     manifest = {
         "total_charts": len(charts_info),
+        "total_occurrences": occurrences,
+        "duplicates_skipped": duplicates,
         "charts": charts_info
     }
 
@@ -100,6 +578,20 @@ def main():
     parser.add_argument('output_dir', help='输出目录路径')
     parser.add_argument('--full-page', action='store_true',
                        help='将每页转为完整图片（需要pdf2image）')
+    parser.add_argument('--db',
+                       help='同时把图表清单写入该SQLite数据库（重复运行会更新记录）')
+    parser.add_argument('--no-dedup', action='store_true',
+                       help='不按内容去重，重复出现的图片每次都写出文件')
+    parser.add_argument('--figures', action='store_true',
+                       help='根据矢量图形检测图表区域，只渲染并裁剪这些区域（比--full-page快得多）')
+    parser.add_argument('--pages',
+                       help='只处理指定页码，如 3-10 或 1,5,8-（默认：全部）')
+    parser.add_argument('--dpi', type=int, default=200,
+                       help='整页图片/图表区域的分辨率（默认：200）')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='整页渲染的并行进程数（默认：CPU核数）')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='对比逐页渲染与单次并行渲染的耗时，不写出文件')
 
     args = parser.parse_args()
 
@@ -109,6 +601,26 @@ def main():
         print(f"❌ 错误：找不到PDF文件：{pdf_path}")
         sys.exit(1)
 
+    # 解析页码范围（页数用poppler读取，避免为数页数而解析整个PDF）
+    page_numbers = None
+    if args.pages or args.benchmark:
+        try:
+            from pdf2image import pdfinfo_from_path
+            total_pages = pdfinfo_from_path(pdf_path)['Pages']
+        except Exception:
+            # pdf2image或poppler未安装时退回pdfplumber
+            with pdfplumber.open(pdf_path) as pdf:
+                total_pages = len(pdf.pages)
+        try:
+            page_numbers = parse_page_ranges(args.pages or '1-', total_pages)
+        except ValueError as e:
+            print(f"❌ 错误：{e}")
+            sys.exit(1)
+
+    if args.benchmark:
+        run_raster_benchmark(pdf_path, page_numbers, args.dpi, args.workers)
+        return
+
     print(f"📊 开始提取PDF图表...")
     print(f"📂 输入文件：{pdf_path}")
     print(f"📁 输出目录：{args.output_dir}")
@@ -116,46 +628,32 @@ def main():
 
     try:
         # 提取图片
-        charts_info, total_images = extract_images_from_pdf(pdf_path, args.output_dir)
+        charts_info, total_images = extract_images_from_pdf(
+            pdf_path, args.output_dir, page_numbers=page_numbers, dedup=not args.no_dedup)
+
+        # 检测图表区域，只渲染含图表的页面
+        if args.figures:
+            print()
+            print("📐 检测图表区域...")
+            figures = extract_figures_from_pdf(
+                pdf_path, args.output_dir, dpi=args.dpi, page_numbers=page_numbers,
+                dedup=not args.no_dedup)
+            charts_info.extend(figures)
+            total_images += len(figures)
 
         # 如果需要，将每页转为完整图片
         if args.full_page:
             try:
-                from pdf2image import convert_from_path
-
                 print()
                 print("🖼️  生成完整页面图片...")
 
-                output_dir = Path(args.output_dir)
-                with pdfplumber.open(pdf_path) as pdf:
-                    total_pages = len(pdf.pages)
-
-                    for page_num in range(1, total_pages + 1):
-                        print(f"⏳ 转换第 {page_num}/{total_pages} 页...", end='\r')
-
-                        images = convert_from_path(
-                            pdf_path,
-                            first_page=page_num,
-                            last_page=page_num,
-                            dpi=200  # 可调整分辨率
-                        )
-
-                        if images:
-                            image_path = output_dir / f"page_{page_num}_full.png"
-                            images[0].save(image_path, 'PNG')
-
-                            # 添加到清单
-                            charts_info.append({
-                                "page": page_num,
-                                "index": 0,
-                                "filename": f"page_{page_num}_full.png",
-                                "type": "full_page",
-                                "width": images[0].width,
-                                "height": images[0].height,
-                            })
-                            total_images += 1
-
-                print()
+                start = time.perf_counter()
+                full_pages = render_full_pages(
+                    pdf_path, args.output_dir, dpi=args.dpi,
+                    page_numbers=page_numbers, workers=args.workers)
+                print(f"✓ 渲染 {len(full_pages)} 页，耗时 {time.perf_counter() - start:.2f} 秒")
+                charts_info.extend(full_pages)
+                total_images += len(full_pages)
 
             except ImportError:
                 print()
@@ -165,14 +663,28 @@ def main():
 
         # 保存清单
         manifest_path = save_charts_manifest(charts_info, args.output_dir)
+        if args.db:
+            import charts_db
+            conn = charts_db.open_db(args.db)
+            charts_db.upsert_charts(conn, pdf_path, args.output_dir, charts_info)
+            conn.close()
 
         print()
         print("✅ 提取完成！")
         print()
         print("📊 统计信息：")
         print(f"  • 提取图片/图表：{total_images} 个")
+        passthrough = sum(1 for c in charts_info if c.get('encoding') == 'passthrough')
+        if passthrough:
+            print(f"  • 原样写出（JPEG/JPEG 2000，未重新编码）：{passthrough} 个")
+        occurrences, duplicates, saved_bytes = dedup_summary(charts_info)
+        if duplicates:
+            print(f"  • 重复图片：{duplicates} 次出现未重复写出"
+                  f"（共 {occurrences} 次出现，节省 {saved_bytes / 1024:.1f} KB）")
         print(f"  • 输出目录：{args.output_dir}")
         print(f"  • 清单文件：{manifest_path}")
+        if args.db:
+            print(f"  • 图表数据库：{args.db}")
         print()
 
         if charts_info:
@@ -186,7 +698,7 @@ def main():
             print("   这可能是因为：")
             print("   1. PDF中没有嵌入图片")
             print("   2. 图片格式不支持")
-            print("   3. 需要使用 --full-page 选项提取完整页面")
+            print("   3. 图表是矢量图形，需要使用 --figures 或 --full-page 选项")
 
     except Exception as e:
         print(f"\n❌ 提取失败：{e}")
@@ -4,10 +4,19 @@ PDF文本提取脚本
 从PDF文档中提取所有文本内容，保持段落结构
 """
 
+import os
 import sys
+import json
+import time
+import shutil
+import hashlib
 import argparse
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from text_stats import count_chars_and_tokens
+
 try:
     import pdfplumber
     PDFPLUMBER_AVAILABLE = True
@@ -20,99 +29,614 @@ try:
 except ImportError:
     PYPDF2_AVAILABLE = False
 
-
-def extract_with_pdfplumber(pdf_path):
-    """使用pdfplumber提取文本（推荐，效果更好）"""
-    text_lines = []
-
-    with pdfplumber.open(pdf_path) as pdf:
+try:
+    from pypdf import PdfReader as PypdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+
+# 提取缓存目录，可通过环境变量 ARTICLE_WRITER_CACHE 指定缓存根目录
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'ARTICLE_WRITER_CACHE', Path.home() / '.cache' / 'article-writer'
+)) / 'extract_text'
+DEFAULT_CACHE_SIZE_MB = 512
+
+# adaptive模式的页面质量判定阈值（同时作为缓存键的一部分）
+ADAPTIVE_OPTIONS = {
+    # 可疑字符（替换符、私用区、康熙部首等错误映射）占非空白字符的比例上限
+    'max_garbled_ratio': 0.05,
+    # 拉丁字母达到该数量时才检查空格缺失
+    'min_latin_letters': 200,
+    # 空格数与拉丁字母数之比低于该值视为单词粘连
+    'min_space_ratio': 0.05,
+}
+
+
+def format_page(page_num, page_text):
+    """为单页文本添加页码分隔标记"""
+    return (
+        f"\n{'='*60}\n"
+        f"第 {page_num} 页\n"
+        f"{'='*60}\n\n"
+        f"{page_text}\n"
+    )
+
+
+def iter_pages_pdfplumber(pdf_path, page_numbers=None, verbose=True):
+    """使用pdfplumber逐页提取文本，逐页产出 (页码, 文本, 引擎)
+
+    page_numbers 为要提取的页码列表（从1开始），默认提取全部页面。
+    每页处理完立即释放pdfplumber缓存的页面对象，内存占用不随页数增长。
+    """
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
         total_pages = len(pdf.pages)
-        print(f"📄 PDF总页数：{total_pages}")
+        if verbose:
+            print(f"📄 PDF总页数：{total_pages}")
 
-        for page_num, page in enumerate(pdf.pages, 1):
-            print(f"⏳ 处理第 {page_num}/{total_pages} 页...", end='\r')
+        for index, page in enumerate(pdf.pages, 1):
+            if verbose:
+                print(f"⏳ 处理第 {index}/{total_pages} 页...", end='\r')
 
             # 提取文本
             page_text = page.extract_text()
 
-            if page_text:
-                # 添加页码标记
-                text_lines.append(f"\n{'='*60}\n")
-                text_lines.append(f"第 {page_num} 页\n")
-                text_lines.append(f"{'='*60}\n\n")
-                text_lines.append(page_text)
-                text_lines.append("\n")
-
-        print()  # 换行
+            # 释放该页解析出的字符、线条等缓存对象
+            page.close()
 
-    return ''.join(text_lines), total_pages
+            yield page.page_number, page_text, 'pdfplumber'
 
+        if verbose:
+            print()  # 换行
 
-def extract_with_pypdf2(pdf_path):
-    """使用PyPDF2提取文本（备选方案）"""
-    text_lines = []
 
+def iter_pages_pypdf2(pdf_path, page_numbers=None, verbose=True):
+    """使用PyPDF2逐页提取文本，逐页产出 (页码, 文本, 引擎)"""
     reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
-    print(f"📄 PDF总页数：{total_pages}")
+    if page_numbers is None:
+        page_numbers = range(1, len(reader.pages) + 1)
+    total_pages = len(page_numbers)
+    if verbose:
+        print(f"📄 PDF总页数：{total_pages}")
 
-    for page_num, page in enumerate(reader.pages, 1):
-        print(f"⏳ 处理第 {page_num}/{total_pages} 页...", end='\r')
+    for index, page_num in enumerate(page_numbers, 1):
+        if verbose:
+            print(f"⏳ 处理第 {index}/{total_pages} 页...", end='\r')
 
         # 提取文本
-        page_text = page.extract_text()
+        yield page_num, reader.pages[page_num - 1].extract_text(), 'pypdf2'
+
+    if verbose:
+        print()  # 换行
 
-        if page_text:
-            # 添加页码标记
-            text_lines.append(f"\n{'='*60}\n")
-            text_lines.append(f"第 {page_num} 页\n")
-            text_lines.append(f"{'='*60}\n\n")
-            text_lines.append(page_text)
-            text_lines.append("\n")
 
-    print()  # 换行
+def assess_page_text(page_text, options=ADAPTIVE_OPTIONS):
+    """快速判断pypdf提取的页面文本是否可用
+
+    返回需要改用pdfplumber的原因，文本可用时返回None。
+    """
+    if not page_text or not page_text.strip():
+        return 'empty'
+
+    visible = 0
+    garbled = 0
+    latin = 0
+    spaces = 0
+    for char in page_text:
+        if char == ' ':
+            spaces += 1
+            continue
+        if char.isspace():
+            continue
+        visible += 1
+        if ('a' <= char <= 'z') or ('A' <= char <= 'Z'):
+            latin += 1
+        elif (char == '\ufffd'
+              or '\ue000' <= char <= '\uf8ff'      # 私用区
+              or '\u2e80' <= char <= '\u2fdf'      # CJK部首补充、康熙部首
+              or '\uf900' <= char <= '\ufaff'      # CJK兼容表意文字
+              or (char < ' ' and char != '\t')):  # 控制字符
+            garbled += 1
+
+    if garbled / visible > options['max_garbled_ratio']:
+        return 'garbled'
+    if latin >= options['min_latin_letters'] and spaces / latin < options['min_space_ratio']:
+        return 'missing_spaces'
+    return None
+
+
+def iter_pages_pypdf(pdf_path, page_numbers=None, verbose=True, fallback=False):
+    """使用pypdf逐页提取文本，逐页产出 (页码, 文本, 引擎)
+
+    fallback=True 时（adaptive模式）质量不合格的页改用pdfplumber重新提取，
+    引擎记录实际采用结果的库；pdfplumber只在第一次需要回退时才打开。
+    """
+    reader = PypdfReader(pdf_path)
+    if page_numbers is None:
+        page_numbers = range(1, len(reader.pages) + 1)
+    total_pages = len(page_numbers)
+    if verbose:
+        print(f"📄 PDF总页数：{total_pages}")
+
+    plumber_pdf = None
+    try:
+        for index, page_num in enumerate(page_numbers, 1):
+            if verbose:
+                print(f"⏳ 处理第 {index}/{total_pages} 页...", end='\r')
+
+            page_text = reader.pages[page_num - 1].extract_text()
+            engine = 'pypdf'
+
+            if fallback and PDFPLUMBER_AVAILABLE and assess_page_text(page_text) is not None:
+                if plumber_pdf is None:
+                    plumber_pdf = pdfplumber.open(pdf_path)
+                page = plumber_pdf.pages[page_num - 1]
+                page_text = page.extract_text()
+                page.close()
+                engine = 'pdfplumber'
+
+            yield page_num, page_text, engine
+    finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+
+    if verbose:
+        print()  # 换行
+
+
+def get_page_count(pdf_path, method):
+    """读取PDF总页数"""
+    if method == 'pdfplumber':
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    if method in ('pypdf', 'adaptive'):
+        return len(PypdfReader(pdf_path).pages)
+    return len(PdfReader(pdf_path).pages)
 
-    return ''.join(text_lines), total_pages
 
+def extract_pages(pdf_path, method, page_numbers):
+    """提取指定页码的文本（供工作进程调用，每个进程打开自己的文件句柄）
 
-def count_chinese_chars(text):
-    """统计中文字符数"""
-    return sum(1 for char in text if '\u4e00' <= char <= '\u9fff')
+    返回 [(页码, 文本, 引擎), ...]，页码从1开始。
+    """
+    return list(iter_pages_serial(pdf_path, method, page_numbers, verbose=False))
 
 
-def count_words(text):
-    """统计总字数（包括中英文）"""
-    # 简单统计：中文字符 + 英文单词
-    chinese_chars = count_chinese_chars(text)
-    # 简化处理：按空格分隔的非中文部分作为英文单词
-    words = text.split()
-    english_words = sum(1 for word in words if not any('\u4e00' <= char <= '\u9fff' for char in word))
-    return chinese_chars + english_words
+def split_page_numbers(page_numbers, workers):
+    """把页码列表切分成若干连续分片
+
+    分片数量约为进程数的4倍，避免个别页面较慢时其他进程空等。
+    """
+    shard_count = min(len(page_numbers), workers * 4)
+    if shard_count == 0:
+        return []
+    shard_size = -(-len(page_numbers) // shard_count)  # 向上取整
+
+    return [
+        page_numbers[i:i + shard_size]
+        for i in range(0, len(page_numbers), shard_size)
+    ]
+
+
+def iter_pages_parallel(pdf_path, method, workers, page_numbers=None, verbose=True):
+    """多进程并行提取文本，按页码顺序逐页产出 (页码, 文本, 引擎)
+
+    同时在途的分片数限制为进程数的2倍，已完成但未轮到输出的分片不会无限堆积。
+    """
+    if page_numbers is None:
+        page_numbers = list(range(1, get_page_count(pdf_path, method) + 1))
+    total_pages = len(page_numbers)
+    if verbose:
+        print(f"📄 PDF总页数：{total_pages}")
+        print(f"⚙️  并行进程数：{workers}")
+
+    shards = iter(split_page_numbers(page_numbers, workers))
+    pending = deque()
+    done_pages = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(executor.submit(extract_pages, pdf_path, method, shard))
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        # 按提交顺序取结果，保证输出顺序与页码一致
+        while pending:
+            results = pending.popleft().result()
+            submit_next()
+
+            yield from results
+
+            done_pages += len(results)
+            if verbose:
+                print(f"⏳ 已完成 {done_pages}/{total_pages} 页...", end='\r')
+
+    if verbose:
+        print()  # 换行
+
+
+def iter_pages_serial(pdf_path, method, page_numbers=None, verbose=True):
+    """按提取方法选择单进程逐页提取方式"""
+    if method == 'pdfplumber':
+        return iter_pages_pdfplumber(pdf_path, page_numbers, verbose)
+    if method in ('pypdf', 'adaptive'):
+        return iter_pages_pypdf(pdf_path, page_numbers, verbose, fallback=(method == 'adaptive'))
+    return iter_pages_pypdf2(pdf_path, page_numbers, verbose)
+
+
+def iter_pages(pdf_path, method, workers=1, page_numbers=None, verbose=True):
+    """按提取方法和进程数选择逐页提取方式"""
+    if workers > 1:
+        return iter_pages_parallel(pdf_path, method, workers, page_numbers, verbose)
+    return iter_pages_serial(pdf_path, method, page_numbers, verbose)
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PageCache:
+    """PDF文本的磁盘缓存，按内容寻址
+
+    缓存键由PDF内容哈希、提取方法和提取选项共同决定，每页单独存一个文件，
+    部分提取的结果也能复用。总大小超过上限时按最近使用时间淘汰整份文档。
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir, pdf_path, method, options=None,
+                 max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024, pdf_hash=None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+        key_source = json.dumps({
+            'version': self.VERSION,
+            'pdf': pdf_hash or hash_file(pdf_path),
+            'method': method,
+            'options': options or {},
+        }, sort_keys=True)
+        self.key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:32]
+        self.entry_dir = self.cache_dir / self.key
+        self.entry_dir.mkdir(parents=True, exist_ok=True)
+
+        # 更新访问时间，用于LRU淘汰
+        os.utime(self.entry_dir)
+
+    def _write(self, path, content):
+        """先在缓存根目录写临时文件再改名，多个进程同时写同一条缓存也不会读到半截内容
+
+        其他进程可能正在淘汰本文档的目录：目录消失时重建后再放一次，仍失败则放弃这条缓存
+        （缓存只用于加速，写不进去不影响提取结果）。
+        """
+        tmp_path = self.cache_dir / f".{self.key}-{path.name}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        try:
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+
+    @property
+    def page_count(self):
+        """缓存的总页数，未缓存时返回None"""
+        meta_path = self.entry_dir / 'meta.json'
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)['total_pages']
+        except FileNotFoundError:
+            return None
+
+    @page_count.setter
+    def page_count(self, total_pages):
+        self._write(self.entry_dir / 'meta.json', json.dumps({'total_pages': total_pages}))
+
+    def get(self, page_num):
+        """读取某页缓存的文本，未命中返回None（空白页缓存为空字符串）"""
+        page_path = self.entry_dir / f"{page_num}.txt"
+        try:
+            with open(page_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, page_num, page_text):
+        self._write(self.entry_dir / f"{page_num}.txt", page_text or '')
+
+    def evict(self):
+        """缓存总大小超过上限时，从最久未使用的文档开始删除（保留当前文档）"""
+        return evict_cache(self.cache_dir, self.max_bytes, keep=(self.entry_dir,))
+
+
+def evict_cache(cache_dir, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024, keep=()):
+    """缓存总大小超过上限时，从最久未使用的文档开始删除，返回删除的文档数
+
+    批量处理时由主进程在全部任务结束后调用一次，避免多个进程同时遍历和删除。
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.is_dir():
+        return 0
+
+    entries = []
+    total_bytes = 0
+    for entry_dir in cache_dir.iterdir():
+        # 其他进程可能正在淘汰同一目录或改名临时文件，消失的条目直接跳过
+        try:
+            if not entry_dir.is_dir():
+                continue
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+        except FileNotFoundError:
+            continue
+        total_bytes += size
+
+    removed = 0
+    for _, size, entry_dir in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if entry_dir in keep:
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_bytes -= size
+        removed += 1
+
+    return removed
+
+
+def iter_pages_cached(pdf_path, method, cache, page_numbers, workers=1, verbose=True):
+    """带缓存的逐页提取：命中的页直接读缓存（引擎记为cache），只提取缺失的页并写回缓存"""
+    # 先把命中的页一次读出来，之后缓存被其他进程淘汰也不影响本次提取
+    cached = {}
+    for page_num in page_numbers:
+        page_text = cache.get(page_num)
+        if page_text is not None:
+            cached[page_num] = page_text
+    missing = [n for n in page_numbers if n not in cached]
+    if verbose:
+        print(f"💾 缓存命中：{len(cached)}/{len(page_numbers)} 页")
+
+    extracted = iter_pages(pdf_path, method, workers, missing, verbose) if missing else iter(())
+
+    for page_num in page_numbers:
+        if page_num in cached:
+            yield page_num, cached.pop(page_num), 'cache'
+            continue
+        _, page_text, engine = next(extracted)
+        cache.put(page_num, page_text)
+        yield page_num, page_text, engine
+
+
+def parse_page_ranges(spec, total_pages):
+    """解析页码范围，如 "100-250"、"1-10,20"、"700-"（到最后一页）
+
+    返回升序去重的页码列表，超出总页数的部分会被忽略。
+    """
+    page_numbers = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = part.split('-', 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else total_pages
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"无法解析页码范围：{part}")
+        if first < 1 or first > last:
+            raise ValueError(f"无效的页码范围：{part}")
+        page_numbers.update(range(first, min(last, total_pages) + 1))
+
+    return sorted(page_numbers)
+
+
+def format_page_ranges(page_numbers):
+    """把升序页码列表压缩成范围字符串，如 [1, 2, 3, 7] -> "1-3,7" """
+    ranges = []
+    for page_num in page_numbers:
+        if ranges and ranges[-1][1] == page_num - 1:
+            ranges[-1][1] = page_num
+        else:
+            ranges.append([page_num, page_num])
+
+    return ','.join(
+        str(first) if first == last else f"{first}-{last}"
+        for first, last in ranges
+    )
+
+
+class ExtractionCheckpoint:
+    """断点续传记录
+
+    每写完一页就记录已完成的页码和输出文件的字节数。中断后重新运行时，
+    先把输出文件截断到最后一次记录的位置（丢弃写了一半的页），再追加剩余页面。
+    PDF内容、提取方法或页码范围变化时，旧记录自动作废。
+    """
+
+    def __init__(self, path, pdf_hash, method, page_numbers):
+        self.path = Path(path)
+        self.identity = {
+            'pdf': pdf_hash,
+            'method': method,
+            'pages': format_page_ranges(page_numbers),
+        }
+        self.completed = []
+        self.output_bytes = 0
+
+    def load(self):
+        """读取已有记录，与当前任务一致时返回True"""
+        if not self.path.exists():
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('identity') != self.identity:
+            return False
+
+        self.completed = parse_page_ranges(data['completed'], sys.maxsize) if data['completed'] else []
+        self.output_bytes = data['output_bytes']
+        return True
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'identity': self.identity,
+                'completed': format_page_ranges(self.completed),
+                'output_bytes': self.output_bytes,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def record(self, page_num, output_bytes):
+        """记录一页已写入完成"""
+        self.completed.append(page_num)
+        self.output_bytes = output_bytes
+        self.save()
+
+    def remove(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+def run_benchmark(pdf_path, method, worker_counts=(1, 2, 4, 8)):
+    """测试不同进程数下的提取速度（页/秒）"""
+    print("⏱️  并行提取基准测试")
+    print("─" * 60)
+    print(f"  {'进程数':<8}{'耗时(秒)':>12}{'页/秒':>12}{'加速比':>10}")
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        total_pages = sum(1 for _ in iter_pages_parallel(pdf_path, method, workers, verbose=False))
+        elapsed = time.perf_counter() - start
+
+        pages_per_sec = total_pages / elapsed if elapsed > 0 else 0
+        if baseline is None:
+            baseline = elapsed
+        speedup = baseline / elapsed if elapsed > 0 else 0
+
+        print(f"  {workers:<8}{elapsed:>12.2f}{pages_per_sec:>12.1f}{speedup:>9.2f}x")
+
+    print("─" * 60)
+
+
+class TextStats:
+    """增量统计提取结果，逐块累加，无需持有全文
+
+    每块都是 format_page 的输出（首尾均为换行符），
+    按块统计的字数、段落数与对全文统计的结果一致。
+    """
+
+    PREVIEW_LENGTH = 200
+
+    def __init__(self):
+        self.total_chars = 0
+        self.chinese_chars = 0
+        self.total_words = 0
+        self.paragraphs = 0
+        self.engines = Counter()
+        self._preview = ''
+
+    def feed(self, chunk):
+        """累加一块文本的统计"""
+        self.total_chars += len(chunk)
+        chinese_chars, other_words = count_chars_and_tokens(chunk)
+        self.chinese_chars += chinese_chars
+        self.total_words += chinese_chars + other_words
+        self.paragraphs += len([p for p in chunk.split('\n\n') if p.strip()])
+
+        if len(self._preview) < self.PREVIEW_LENGTH:
+            self._preview = (self._preview + chunk).lstrip()[:self.PREVIEW_LENGTH * 2]
+
+    @property
+    def preview(self):
+        """全文去除首尾空白后的前200字"""
+        return self._preview.rstrip()[:self.PREVIEW_LENGTH]
+
+
+def extract_to_file(pages, output_path, checkpoint=None, append=False):
+    """把逐页产出的文本边提取边写入文件，返回 (统计, 总页数)
+
+    stats.engines 记录每个引擎（含缓存）处理的页数。
+    传入checkpoint时每写完一页就落盘并更新断点记录。
+    """
+    stats = TextStats()
+    total_pages = 0
+
+    with open(output_path, 'a' if append else 'w', encoding='utf-8') as f:
+        for page_num, page_text, engine in pages:
+            total_pages += 1
+            stats.engines[engine] += 1
+            if page_text:
+                chunk = format_page(page_num, page_text)
+                f.write(chunk)
+                stats.feed(chunk)
+
+            if checkpoint is not None:
+                f.flush()
+                checkpoint.record(page_num, f.tell())
+
+    return stats, total_pages
 
 
 def main():
     parser = argparse.ArgumentParser(description='从PDF提取文本')
     parser.add_argument('pdf_path', help='PDF文件路径')
-    parser.add_argument('output_path', help='输出文本文件路径')
-    parser.add_argument('--method', choices=['pdfplumber', 'pypdf2', 'auto'],
-                       default='auto', help='提取方法（默认：auto）')
+    parser.add_argument('output_path', nargs='?', help='输出文本文件路径')
+    parser.add_argument('--method', choices=['pdfplumber', 'pypdf', 'pypdf2', 'adaptive', 'auto'],
+                       default='auto',
+                       help='提取方法（默认：auto）；adaptive先用pypdf快速提取，质量不佳的页再用pdfplumber')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='并行提取的进程数（默认：1，即单进程）')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='测试1/2/4/8个进程的提取速度，不写出文件')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不读写提取缓存，强制重新解析PDF')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help=f'提取缓存目录（默认：{DEFAULT_CACHE_DIR}）')
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_CACHE_SIZE_MB,
+                       help=f'缓存总大小上限，超出后淘汰最久未用的文档（默认：{DEFAULT_CACHE_SIZE_MB}）')
+    parser.add_argument('--pages',
+                       help='只提取指定页码，如 100-250 或 1-10,20-（默认：全部）')
+    parser.add_argument('--checkpoint',
+                       help='断点记录文件路径（默认：<输出文件>.checkpoint.json）')
+    parser.add_argument('--restart', action='store_true',
+                       help='忽略已有断点记录，从头开始提取')
 
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error('--workers 必须大于等于1')
+    if not args.benchmark and not args.output_path:
+        parser.error('需要指定输出文本文件路径')
+
     # 检查输入文件
     pdf_path = Path(args.pdf_path)
     if not pdf_path.exists():
         print(f"❌ 错误：找不到PDF文件：{pdf_path}")
         sys.exit(1)
 
-    # 创建输出目录
-    output_path = Path(args.output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not args.benchmark:
+        # 创建输出目录
+        output_path = Path(args.output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    print(f"📚 开始提取PDF文本...")
-    print(f"📂 输入文件：{pdf_path}")
-    print(f"📝 输出文件：{output_path}")
-    print()
+        print(f"📚 开始提取PDF文本...")
+        print(f"📂 输入文件：{pdf_path}")
+        print(f"📝 输出文件：{output_path}")
+        print()
 
     # 选择提取方法
     method = args.method
@@ -127,46 +651,105 @@ def main():
             print("❌ 错误：未安装PDF处理库")
             print("请运行：pip install pdfplumber PyPDF2")
             sys.exit(1)
+    elif method == 'pdfplumber' and not PDFPLUMBER_AVAILABLE:
+        print("❌ 错误：pdfplumber未安装")
+        print("请运行：pip install pdfplumber")
+        sys.exit(1)
+    elif method == 'pypdf2' and not PYPDF2_AVAILABLE:
+        print("❌ 错误：PyPDF2未安装")
+        print("请运行：pip install PyPDF2")
+        sys.exit(1)
+    elif method in ('pypdf', 'adaptive') and not PYPDF_AVAILABLE:
+        print("❌ 错误：pypdf未安装")
+        print("请运行：pip install pypdf")
+        sys.exit(1)
+    elif method == 'adaptive' and not PDFPLUMBER_AVAILABLE:
+        print("⚠️  警告：pdfplumber未安装，adaptive模式将只使用pypdf，不做回退")
+
+    if args.benchmark:
+        run_benchmark(pdf_path, method)
+        return
 
     # 提取文本
     try:
-        if method == 'pdfplumber':
-            if not PDFPLUMBER_AVAILABLE:
-                print("❌ 错误：pdfplumber未安装")
-                print("请运行：pip install pdfplumber")
-                sys.exit(1)
-            text, total_pages = extract_with_pdfplumber(pdf_path)
-        else:  # pypdf2
-            if not PYPDF2_AVAILABLE:
-                print("❌ 错误：PyPDF2未安装")
-                print("请运行：pip install PyPDF2")
+        pdf_hash = hash_file(pdf_path)
+
+        cache = None
+        total_pages = None
+        if not args.no_cache:
+            options = ADAPTIVE_OPTIONS if method == 'adaptive' else None
+            cache = PageCache(args.cache_dir, pdf_path, method, options,
+                              max_bytes=args.cache_size_mb * 1024 * 1024,
+                              pdf_hash=pdf_hash)
+            total_pages = cache.page_count
+        if total_pages is None:
+            total_pages = get_page_count(pdf_path, method)
+            if cache is not None:
+                cache.page_count = total_pages
+
+        # 确定要提取的页码
+        if args.pages:
+            try:
+                page_numbers = parse_page_ranges(args.pages, total_pages)
+            except ValueError as e:
+                print(f"❌ 错误：{e}")
                 sys.exit(1)
-            text, total_pages = extract_with_pypdf2(pdf_path)
+            print(f"📑 页码范围：{format_page_ranges(page_numbers) or '无'}（共 {len(page_numbers)} 页）")
+        else:
+            page_numbers = list(range(1, total_pages + 1))
+
+        # 断点续传：截断到上次记录的位置，只提取剩余页面
+        checkpoint_path = args.checkpoint or output_path.with_name(output_path.name + '.checkpoint.json')
+        checkpoint = ExtractionCheckpoint(checkpoint_path, pdf_hash, method, page_numbers)
+        resumed_pages = 0
+        if not args.restart and output_path.exists() and checkpoint.load():
+            with open(output_path, 'r+b') as f:
+                f.truncate(checkpoint.output_bytes)
+            done = set(checkpoint.completed)
+            resumed_pages = len(done)
+            page_numbers = [n for n in page_numbers if n not in done]
+            print(f"🔁 从断点继续：已完成 {resumed_pages} 页，剩余 {len(page_numbers)} 页")
+        checkpoint.save()
+
+        if not page_numbers:
+            pages = iter(())
+        elif cache is None:
+            pages = iter_pages(pdf_path, method, args.workers, page_numbers)
+        else:
+            pages = iter_pages_cached(pdf_path, method, cache, page_numbers, args.workers)
 
-        # 保存文本
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(text)
+        # 逐页写入文本，同时累加统计信息
+        stats, extracted_pages = extract_to_file(pages, output_path, checkpoint,
+                                                 append=resumed_pages > 0)
+        checkpoint.remove()
 
-        # 统计信息
-        total_chars = len(text)
-        chinese_chars = count_chinese_chars(text)
-        total_words = count_words(text)
-        paragraphs = len([p for p in text.split('\n\n') if p.strip()])
+        if cache is not None:
+            cache.evict()
 
         print()
         print("✅ 提取完成！")
         print()
         print("📊 统计信息：")
         print(f"  • 总页数：{total_pages}")
-        print(f"  • 总字符：{total_chars:,}")
-        print(f"  • 中文字符：{chinese_chars:,}")
-        print(f"  • 总字数（估算）：{total_words:,}")
-        print(f"  • 段落数：{paragraphs}")
+        if resumed_pages or args.pages:
+            print(f"  • 本次提取：{extracted_pages} 页")
+        if resumed_pages:
+            print(f"  • 续传跳过：{resumed_pages} 页（以下统计仅含本次提取部分）")
+        print(f"  • 总字符：{stats.total_chars:,}")
+        print(f"  • 中文字符：{stats.chinese_chars:,}")
+        print(f"  • 总字数（估算）：{stats.total_words:,}")
+        print(f"  • 段落数：{stats.paragraphs}")
+        if method == 'adaptive':
+            slow_pages = stats.engines['pdfplumber']
+            print(f"  • pypdf快速提取：{stats.engines['pypdf']} 页")
+            print(f"  • 回退pdfplumber：{slow_pages} 页")
+        if stats.engines['cache']:
+            print(f"  • 缓存命中：{stats.engines['cache']} 页")
         print()
         print(f"  输出文件：{output_path}")
 
         # 预览前200字
-        preview = text.strip()[:200].replace('\n', ' ')
+        preview = stats.preview.replace('\n', ' ')
         print()
         print("📖 前200字预览：")
         print("─" * 60)
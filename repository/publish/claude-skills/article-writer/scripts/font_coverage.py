@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+字体覆盖范围工具
+读取 generate_pdf.py 实际使用的字体的cmap，生成码位覆盖位图并缓存到磁盘，
+用于判断文本中哪些字符在PDF里会显示为方块
+（位图按字体文件内容哈希缓存，查询每个字符是O(1)的位运算）
+"""
+
+import io
+import os
+import sys
+import time
+import zlib
+import shutil
+import hashlib
+import argparse
+import subprocess
+import unicodedata
+from pathlib import Path
+
+try:
+    from fontTools.ttLib import TTFont
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+
+# generate_pdf.py 的CSS按此顺序回退，PDF里的字形都来自这些字体
+BODY_FONT_FAMILIES = ("Noto Sans CJK SC", "Noto Serif CJK SC", "WenQuanYi Micro Hei", "SimSun")
+CODE_FONT_FAMILIES = ("Consolas", "Monaco", "Courier New")
+
+# 覆盖位图缓存目录，可通过环境变量 ARTICLE_WRITER_CACHE 指定缓存根目录
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'ARTICLE_WRITER_CACHE', Path.home() / '.cache' / 'article-writer'
+)) / 'fonts'
+
+# 整个Unicode码位空间每个码位一位，共 0x110000 / 8 = 136 KB（磁盘上zlib压缩后通常只有几KB）
+COVERAGE_BYTES = 0x110000 // 8
+
+# 不需要字形的字符：控制字符、格式字符（如零宽连接符）和空白
+NO_GLYPH_CATEGORIES = {'Cc', 'Cf', 'Zs', 'Zl', 'Zp'}
+
+
+def css_font_stack(families, generic):
+    """生成CSS的 font-family 值"""
+    return ', '.join(f'"{family}"' for family in families) + f', {generic}'
+
+
+def find_font_files(families):
+    """用 fc-match 找到每个字体族实际匹配的字体文件，返回去重后的 [(路径, 索引)]
+
+    fc-match 对未安装的字体族会返回回退字体，这也正是渲染时fontconfig会用的字体。
+    """
+    if not shutil.which('fc-match'):
+        return []
+
+    fonts = []
+    for family in families:
+        result = subprocess.run(
+            ['fc-match', '--format=%{file}\n%{index}', family],
+            capture_output=True, text=True)
+        if result.returncode != 0 or not result.stdout.strip():
+            continue
+        file_path, _, index = result.stdout.partition('\n')
+        font = (file_path, int(index or 0))
+        if font not in fonts:
+            fonts.append(font)
+    return fonts
+
+
+def hash_font_file(path, chunk_size=1024 * 1024):
+    """计算字体文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_coverage(font_path, index=0):
+    """读取字体cmap，返回码位覆盖位图（bytearray，第cp位为1表示有字形）"""
+    font = TTFont(font_path, fontNumber=index, lazy=True)
+    try:
+        cmap = font.getBestCmap() or {}
+    finally:
+        font.close()
+
+    bitmap = bytearray(COVERAGE_BYTES)
+    for codepoint in cmap:
+        bitmap[codepoint >> 3] |= 1 << (codepoint & 7)
+    return bitmap
+
+
+def load_coverage(font_path, index=0, cache_dir=DEFAULT_CACHE_DIR):
+    """返回字体的覆盖位图，优先读磁盘缓存
+
+    缓存键是字体文件内容哈希和集合内索引，字体升级后自动失效。
+    """
+    cache_dir = Path(cache_dir)
+    cache_path = cache_dir / f"{hash_font_file(font_path)[:32]}-{index}.bin"
+
+    if cache_path.exists():
+        try:
+            bitmap = zlib.decompress(cache_path.read_bytes())
+        except zlib.error:
+            # 缓存文件被截断或损坏，当作未命中重新生成
+            bitmap = None
+        if bitmap is not None and len(bitmap) == COVERAGE_BYTES:
+            return bitmap
+
+    bitmap = build_coverage(font_path, index)
+
+    # 先写临时文件再改名，多个进程同时生成同一份缓存也不会读到半截内容
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(zlib.compress(bytes(bitmap), 9))
+    os.replace(tmp_path, cache_path)
+    return bitmap
+
+
+class FontCoverage:
+    """多个字体覆盖范围的并集，任一字体有字形即视为可显示"""
+
+    def __init__(self, fonts, cache_dir=DEFAULT_CACHE_DIR):
+        self.fonts = list(fonts)
+        combined = 0
+        for font_path, index in self.fonts:
+            combined |= int.from_bytes(load_coverage(font_path, index, cache_dir), 'little')
+        self.bitmap = combined.to_bytes(COVERAGE_BYTES, 'little')
+
+    @classmethod
+    def for_pdf(cls, extra_fonts=(), cache_dir=DEFAULT_CACHE_DIR):
+        """generate_pdf.py 正文和代码字体（加上额外指定的字体文件）的覆盖范围"""
+        fonts = find_font_files(BODY_FONT_FAMILIES + CODE_FONT_FAMILIES)
+        fonts.extend((str(path), 0) for path in extra_fonts)
+        return cls(fonts, cache_dir)
+
+    def covers(self, char):
+        """字符是否有字形（不需要字形的控制、格式和空白字符也返回True）"""
+        codepoint = ord(char)
+        if self.bitmap[codepoint >> 3] >> (codepoint & 7) & 1:
+            return True
+        return unicodedata.category(char) in NO_GLYPH_CATEGORIES
+
+    def missing_chars(self, text):
+        """返回文本中没有字形的字符集合（每种字符只查一次）"""
+        return {char for char in set(text) if not self.covers(char)}
+
+    @property
+    def total_glyphs(self):
+        """覆盖的码位数"""
+        return bin(int.from_bytes(self.bitmap, 'little')).count('1')
+
+
+def _iter_font_descriptors(font):
+    """产出字体字典（含Type0的子字体）中的 FontDescriptor"""
+    font = font.get_object()
+    for descendant in font.get('/DescendantFonts') or []:
+        yield from _iter_font_descriptors(descendant)
+    if '/FontDescriptor' in font:
+        yield font['/FontDescriptor'].get_object()
+
+
+def embedded_fonts(pdf_path):
+    """统计PDF中嵌入的字体：返回 [{'name', 'bytes', 'glyphs'}]
+
+    bytes 是嵌入字体数据解码（解压）后的大小；glyphs 用fontTools读取的字形数，
+    用来确认CJK字体只嵌入了用到的子集（无法解析时为None）。
+    """
+    reader = PdfReader(str(pdf_path))
+    fonts = {}
+
+    for page in reader.pages:
+        resources = page.get('/Resources')
+        font_dict = resources.get_object().get('/Font') if resources else None
+        if not font_dict:
+            continue
+        for font in font_dict.get_object().values():
+            for descriptor in _iter_font_descriptors(font):
+                for key in ('/FontFile2', '/FontFile3', '/FontFile'):
+                    if key not in descriptor:
+                        continue
+                    ref = descriptor.raw_get(key)
+                    ident = getattr(ref, 'idnum', id(ref))
+                    if ident in fonts:
+                        break
+                    data = descriptor[key].get_object().get_data()
+                    glyphs = None
+                    if FONTTOOLS_AVAILABLE and key != '/FontFile':
+                        try:
+                            glyphs = TTFont(io.BytesIO(data), lazy=True)['maxp'].numGlyphs
+                        except Exception:
+                            glyphs = None
+                    fonts[ident] = {
+                        'name': str(descriptor.get('/FontName', '?')).lstrip('/'),
+                        # pypdf解析时会去掉流的 /Length，这里统计解码后的字体数据大小
+                        'bytes': len(data),
+                        'glyphs': glyphs,
+                    }
+                    break
+
+    return list(fonts.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查文本中哪些字符在PDF字体里没有字形')
+    parser.add_argument('file_path', nargs='?', help='要检查的Markdown/文本文件')
+    parser.add_argument('--font', action='append', default=[],
+                       help='额外的字体文件（可多次指定）')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help=f'覆盖位图缓存目录（默认：{DEFAULT_CACHE_DIR}）')
+
+    args = parser.parse_args()
+
+    if not FONTTOOLS_AVAILABLE:
+        print("❌ 错误：缺少fontTools库")
+        print("请运行：pip install fonttools")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    coverage = FontCoverage.for_pdf(args.font, args.cache_dir)
+    if not coverage.fonts:
+        print("❌ 错误：没有找到字体（需要fontconfig的fc-match，或用 --font 指定字体文件）")
+        sys.exit(1)
+
+    print("🔤 PDF使用的字体：")
+    for font_path, index in coverage.fonts:
+        suffix = f"（索引 {index}）" if index else ''
+        print(f"  • {font_path}{suffix}")
+    print(f"  共覆盖 {coverage.total_glyphs:,} 个码位，加载耗时 {time.perf_counter() - start:.3f} 秒")
+
+    if not args.file_path:
+        return
+
+    file_path = Path(args.file_path)
+    if not file_path.exists():
+        print(f"❌ 错误：找不到文件：{file_path}")
+        sys.exit(1)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    missing = coverage.missing_chars(text)
+    print()
+    if not missing:
+        print("✅ 所有字符都有字形")
+        return
+
+    print(f"⚠️  {len(missing)} 种字符没有字形（PDF中会显示为方块）：")
+    for char in sorted(missing):
+        name = unicodedata.name(char, '')
+        print(f"  • {char}  U+{ord(char):04X} {name}  ×{text.count(char)}")
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,20 @@ Markdown转PDF生成脚本
 支持中文、中文标点、图片嵌入
 """
 
+import io
+import os
 import sys
+import json
+import time
+import hashlib
 import argparse
 from pathlib import Path
+from urllib.parse import unquote, urlparse
 import re
 
+import font_coverage
+from font_coverage import BODY_FONT_FAMILIES, CODE_FONT_FAMILIES, css_font_stack
+
 try:
     import markdown2
     from weasyprint import HTML, CSS
@@ -17,6 +26,192 @@ try:
 except ImportError:
     WEASYPRINT_AVAILABLE = False
 
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# 进程内共享的字体配置：同一进程多次生成PDF时不再重复初始化fontconfig和加载字体
+# （跨进程的字体发现由fontconfig自己的磁盘缓存负责，见 fc-cache）
+_FONT_CONFIG = None
+
+
+def get_font_config():
+    """返回进程内共享的 FontConfiguration，以及本次调用花在创建上的秒数（复用时为0）"""
+    global _FONT_CONFIG
+    if _FONT_CONFIG is not None:
+        return _FONT_CONFIG, 0.0
+
+    start = time.perf_counter()
+    _FONT_CONFIG = FontConfiguration()
+    return _FONT_CONFIG, time.perf_counter() - start
+
+
+# 进程内共享的已解析样式表：批量生成时每个进程只解析一次CSS
+_STYLESHEET = None
+
+
+def get_stylesheet():
+    """返回进程内共享的已解析样式表（与字体配置绑定）"""
+    global _STYLESHEET
+    if _STYLESHEET is None:
+        font_config, _ = get_font_config()
+        _STYLESHEET = CSS(string=build_css(), font_config=font_config)
+    return _STYLESHEET
+
+
+def pdf_write_options():
+    """保证只嵌入用到字形的 write_pdf 参数
+
+    显式关闭完整字体嵌入，并去掉屏幕显示才需要的hinting（WeasyPrint 60+）。
+    """
+    return {'full_fonts': False, 'hinting': False}
+
+
+# 图片预处理缓存目录，可通过环境变量 ARTICLE_WRITER_CACHE 指定缓存根目录
+IMAGE_CACHE_DIR = Path(os.environ.get(
+    'ARTICLE_WRITER_CACHE', Path.home() / '.cache' / 'article-writer'
+)) / 'images'
+IMAGE_CACHE_VERSION = 1
+
+# 图片在页面上的最大尺寸，与CSS中 img 的 max-width: 85%（A4宽210mm减去左右各1.5cm页边距）
+# 和 max-height: 400pt 一致，超出这个尺寸的像素打印时不会显示
+IMAGE_MAX_WIDTH_IN = (210 - 2 * 15) / 25.4 * 0.85
+IMAGE_MAX_HEIGHT_IN = 400 / 72
+DEFAULT_IMAGE_DPI = 200
+DEFAULT_JPEG_QUALITY = 85
+
+IMG_SRC_RE = re.compile(r'<img src="([^"]+)"')
+
+
+def resolve_image_path(src, base_dir):
+    """把img的src解析为本地文件路径，远程图片返回None"""
+    if src.startswith(('http://', 'https://', 'data:')):
+        return None
+    if src.startswith('file://'):
+        return Path(unquote(urlparse(src).path))
+    return Path(base_dir) / unquote(src)
+
+
+def _encode_image(img, quality):
+    """重新压缩图片：有透明通道或颜色很少（图表、线稿）时用PNG，照片类插图用JPEG"""
+    buffer = io.BytesIO()
+    has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    if has_alpha or img.getcolors(256) is not None:
+        img.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue(), '.png'
+    img.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue(), '.jpg'
+
+
+def preprocess_image(source_path, dpi=DEFAULT_IMAGE_DPI, quality=DEFAULT_JPEG_QUALITY,
+                     cache_dir=IMAGE_CACHE_DIR):
+    """按打印分辨率缩小并重新压缩图片，返回 (处理后的文件路径, 是否命中缓存)
+
+    缓存键由源文件内容哈希和处理参数共同决定。处理后没有变小时沿用源文件
+    （这个判断也会缓存，下次不再重新压缩）。
+    """
+    data = Path(source_path).read_bytes()
+    key_source = json.dumps({
+        'version': IMAGE_CACHE_VERSION,
+        'source': hashlib.sha256(data).hexdigest(),
+        'dpi': dpi,
+        'quality': quality,
+    }, sort_keys=True)
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:32]
+
+    cache_dir = Path(cache_dir)
+    for suffix in ('.png', '.jpg'):
+        cached = cache_dir / f"{key}{suffix}"
+        if cached.exists():
+            return cached, True
+    if (cache_dir / f"{key}.keep").exists():
+        return Path(source_path), True
+
+    with Image.open(io.BytesIO(data)) as img:
+        if getattr(img, 'is_animated', False):
+            encoded = None
+        else:
+            # 重新编码会丢掉EXIF，先按EXIF方向转正
+            img = ImageOps.exif_transpose(img)
+            # dpi很小时目标尺寸至少保留1像素
+            max_width = max(1, round(IMAGE_MAX_WIDTH_IN * dpi))
+            max_height = max(1, round(IMAGE_MAX_HEIGHT_IN * dpi))
+            scale = min(1.0, max_width / img.width, max_height / img.height)
+            if scale < 1.0:
+                size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+                img = img.resize(size, Image.LANCZOS)
+            encoded, suffix = _encode_image(img, quality)
+
+    # 先写临时文件再改名，多个进程同时处理同一张图也不会读到半截内容
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    if encoded is None or len(encoded) >= len(data):
+        (cache_dir / f"{key}.keep").touch()
+        return Path(source_path), False
+
+    cached = cache_dir / f"{key}{suffix}"
+    tmp_path = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(encoded)
+    os.replace(tmp_path, cached)
+    return cached, False
+
+
+def optimize_images(html_content, base_dir, dpi=DEFAULT_IMAGE_DPI, quality=DEFAULT_JPEG_QUALITY,
+                    cache_dir=IMAGE_CACHE_DIR):
+    """把HTML中的本地图片替换为预处理后的缓存文件，返回 (新HTML, 统计信息)
+
+    同一张图片在文中多次出现时只处理一次；无法识别的图片（如SVG）保持原样。
+    """
+    stats = {'images': 0, 'cached': 0, 'original_bytes': 0, 'optimized_bytes': 0}
+    replacements = {}
+
+    def replace_img(match):
+        src = match.group(1)
+        if src not in replacements:
+            replacements[src] = None
+            path = resolve_image_path(src, base_dir)
+            if path is not None and path.is_file():
+                try:
+                    processed, hit = preprocess_image(path, dpi, quality, cache_dir)
+                except (OSError, ValueError, Image.DecompressionBombError):
+                    # 损坏、格式不支持或像素数超限的图片按原文件嵌入
+                    processed = None
+                if processed is not None:
+                    replacements[src] = processed.as_uri()
+                    stats['images'] += 1
+                    stats['cached'] += hit
+                    stats['original_bytes'] += path.stat().st_size
+                    stats['optimized_bytes'] += processed.stat().st_size
+
+        if replacements[src] is None:
+            return match.group(0)
+        return f'<img src="{replacements[src]}"'
+
+    return IMG_SRC_RE.sub(replace_img, html_content), stats
+
+
+def image_dpi_type(value):
+    """argparse 的 --image-dpi 类型：0 表示不处理图片，否则必须为正数"""
+    dpi = int(value)
+    if dpi < 0:
+        raise argparse.ArgumentTypeError(f"必须为0（不处理图片）或正整数：{value}")
+    return dpi
+
+
+def warm_up():
+    """预先加载字体：渲染一小段中英文混排的文档并丢弃结果
+
+    WeasyPrint在第一次排版时才真正打开字体文件，常驻进程（见 pdf_server.py）
+    启动时调用一次，之后的请求就不再承担这部分开销。
+    """
+    font_config, _ = get_font_config()
+    html = create_html_document("<h1>预热</h1><p>中文 English <code>code()</code></p>",
+                                inline_css=False)
+    HTML(string=html).write_pdf(stylesheets=[get_stylesheet()], font_config=font_config,
+                                **pdf_write_options())
+
 
 def convert_markdown_to_html(md_content, images_dir=None):
     """将Markdown转换为HTML"""
@@ -49,17 +244,16 @@ def convert_markdown_to_html(md_content, images_dir=None):
     return html_content
 
 
-def create_html_document(html_content, title="Article", font_family="Source Han Sans SC"):
-    """创建完整的HTML文档，包含CSS样式"""
-
-    css_style = f"""
+def build_css():
+    """返回文章的CSS样式"""
+    return f"""
     @page {{
         size: A4;
         margin: 2cm 1.5cm;
     }}
 
     body {{
-        font-family: "Noto Sans CJK SC", "Noto Serif CJK SC", "WenQuanYi Micro Hei", "SimSun", sans-serif;
+        font-family: {css_font_stack(BODY_FONT_FAMILIES, 'sans-serif')};
         font-size: 11pt;
         line-height: 1.8;
         color: #333;
@@ -124,7 +318,7 @@ def create_html_document(html_content, title="Article", font_family="Source Han
     }}
 
     code {{
-        font-family: "Consolas", "Monaco", "Courier New", monospace;
+        font-family: {css_font_stack(CODE_FONT_FAMILIES, 'monospace')};
         background-color: #f4f4f4;
         padding: 2pt 4pt;
         border-radius: 3px;
@@ -233,6 +427,15 @@ def create_html_document(html_content, title="Article", font_family="Source Han
     }}
     """
 
+
+def create_html_document(html_content, title="Article", font_family="Source Han Sans SC",
+                         inline_css=True):
+    """创建完整的HTML文档，默认内嵌CSS样式
+
+    inline_css=False 时不内嵌样式，渲染时改为传入 get_stylesheet() 返回的已解析样式表。
+    """
+    style = f"<style>\n            {build_css()}\n        </style>" if inline_css else ""
+
     full_html = f"""
     <!DOCTYPE html>
     <html lang="zh-CN">
@@ -240,9 +443,7 @@ def create_html_document(html_content, title="Article", font_family="Source Han
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>{title}</title>
-        <style>
-            {css_style}
-        </style>
+        {style}
     </head>
     <body>
         {html_content}
@@ -253,7 +454,7 @@ def create_html_document(html_content, title="Article", font_family="Source Han
     return full_html
 
 
-def generate_pdf(md_path, pdf_path, **options):
+def generate_pdf(md_path, pdf_path, verbose=True, **options):
     """生成PDF文件"""
     if not WEASYPRINT_AVAILABLE:
         print("❌ 错误：缺少必要的库")
@@ -268,65 +469,138 @@ def generate_pdf(md_path, pdf_path, **options):
     title_match = re.search(r'^#\s+(.+)$', md_content, re.MULTILINE)
     title = title_match.group(1) if title_match else "Article"
 
-    print(f"📝 文章标题：{title}")
-    print()
+    if verbose:
+        print(f"📝 文章标题：{title}")
+        print()
 
     # 转换为HTML
-    print("🔄 转换Markdown到HTML...")
+    if verbose:
+        print("🔄 转换Markdown到HTML...")
     html_content = convert_markdown_to_html(
         md_content,
         images_dir=options.get('images_dir')
     )
 
-    # 创建完整HTML文档
-    print("🎨 应用样式...")
+    # 相对图片路径按Markdown文件所在目录解析
+    base_dir = Path(md_path).resolve().parent
+
+    # 按打印分辨率预处理图片（缩小、重新压缩，结果缓存）
+    image_stats = None
+    image_dpi = options.get('image_dpi', DEFAULT_IMAGE_DPI)
+    if image_dpi and PIL_AVAILABLE:
+        if verbose:
+            print("🖼️  预处理图片...")
+        start = time.perf_counter()
+        html_content, image_stats = optimize_images(
+            html_content, base_dir, dpi=image_dpi,
+            quality=options.get('jpeg_quality', DEFAULT_JPEG_QUALITY),
+            cache_dir=options.get('image_cache_dir', IMAGE_CACHE_DIR))
+        image_stats['seconds'] = time.perf_counter() - start
+
+    # 创建完整HTML文档，样式表单独解析并在进程内复用
+    if verbose:
+        print("🎨 应用样式...")
     full_html = create_html_document(
         html_content,
         title=title,
-        font_family=options.get('font_family', 'Source Han Sans SC')
+        font_family=options.get('font_family', 'Source Han Sans SC'),
+        inline_css=False
     )
 
     # 生成PDF
-    print("📄 生成PDF...")
-
-    # 配置字体
-    font_config = FontConfiguration()
-
-    # 创建临时HTML文件
-    temp_html_path = Path(pdf_path).parent / "temp.html"
-    with open(temp_html_path, 'w', encoding='utf-8') as f:
-        f.write(full_html)
-
-    try:
-        # 生成PDF
-        HTML(filename=str(temp_html_path)).write_pdf(
-            pdf_path,
-            font_config=font_config
-        )
-
-        # 删除临时文件
-        temp_html_path.unlink()
+    if verbose:
+        print("📄 生成PDF...")
+
+    # 配置字体和样式表（进程内复用）
+    font_config, font_config_seconds = get_font_config()
+    stylesheet = get_stylesheet()
+
+    # 直接从内存中的HTML渲染，不写临时文件（同一目录并行生成多份PDF也不会互相覆盖）
+    base_url = base_dir.as_uri() + '/'
+    start = time.perf_counter()
+    HTML(string=full_html, base_url=base_url).write_pdf(
+        pdf_path,
+        stylesheets=[stylesheet],
+        font_config=font_config,
+        **pdf_write_options(),
+        **options.get('write_options', {})
+    )
+    render_seconds = time.perf_counter() - start
 
+    if verbose:
         print("✅ PDF生成成功！")
 
-        # 获取文件信息
-        pdf_size = Path(pdf_path).stat().st_size
-        pdf_size_mb = pdf_size / (1024 * 1024)
-
-        return {
-            'size': pdf_size,
-            'size_mb': pdf_size_mb,
-            'path': pdf_path
-        }
-
-    except Exception as e:
-        # 删除临时文件
-        if temp_html_path.exists():
-            temp_html_path.unlink()
-        raise e
-
+    # 获取文件信息
+    pdf_size = Path(pdf_path).stat().st_size
+    pdf_size_mb = pdf_size / (1024 * 1024)
+
+    # 嵌入字体的大小和字形数，用于跟踪子集化效果（需要重新解析生成的PDF，默认不统计）
+    fonts = None
+    if options.get('font_stats') and font_coverage.PYPDF_AVAILABLE:
+        try:
+            fonts = font_coverage.embedded_fonts(pdf_path)
+        except Exception as e:
+            # PDF已经生成成功，统计失败只提示
+            print(f"⚠️  警告：无法统计嵌入字体：{e}")
+
+    return {
+        'size': pdf_size,
+        'size_mb': pdf_size_mb,
+        'path': pdf_path,
+        'font_config_seconds': font_config_seconds,
+        'render_seconds': render_seconds,
+        'fonts': fonts,
+        'images': image_stats,
+    }
+
+
+def run_benchmark(md_path, pdf_path, images_dir=None, dpi=DEFAULT_IMAGE_DPI,
+                  quality=DEFAULT_JPEG_QUALITY):
+    """对比不同图片处理方式生成的PDF大小和耗时，pdf_path 写出默认方式的结果
+
+    对比原图嵌入、预处理缓存（本脚本默认，分别测空缓存和命中缓存），
+    以及交给WeasyPrint在写出时按 dpi/jpeg_quality 处理图片。
+    """
+    import shutil
+    import tempfile
+
+    cases = (
+        ('原图嵌入', {'image_dpi': 0}),
+        ('预处理（空缓存）', {'image_dpi': dpi}),
+        ('预处理（命中缓存）', {'image_dpi': dpi}),
+        ('WeasyPrint内置', {'image_dpi': 0, 'write_options': {
+            'dpi': dpi, 'jpeg_quality': quality, 'optimize_images': True}}),
+    )
 
-def main():
+    print(f"⏱️  基准测试：{md_path}（{dpi} DPI，JPEG质量 {quality}）")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        # 先渲染一次，字体和样式表的加载不计入各项耗时
+        generate_pdf(md_path, tmp_dir / 'warm.pdf', verbose=False, image_dpi=0)
+
+        for index, (name, options) in enumerate(cases):
+            start = time.perf_counter()
+            info = generate_pdf(md_path, tmp_dir / f'{index}.pdf', verbose=False,
+                                images_dir=images_dir, jpeg_quality=quality,
+                                image_cache_dir=tmp_dir / 'images', **options)
+            rows.append((name, info['size'], info['render_seconds'],
+                         time.perf_counter() - start))
+
+        shutil.copy(tmp_dir / '2.pdf', pdf_path)
+
+    print("─" * 64)
+    print(f"  {'方式':<14}{'PDF大小(MB)':>12}{'渲染(秒)':>10}{'总耗时(秒)':>12}")
+    for name, size, render_seconds, seconds in rows:
+        print(f"  {name:<14}{size / 1024 / 1024:>12.2f}{render_seconds:>10.2f}{seconds:>12.2f}")
+    print("─" * 64)
+    _, base_size, _, base_seconds = rows[0]
+    for name, size, _, seconds in rows[1:]:
+        print(f"  {name}：大小为原图嵌入的 {size / max(base_size, 1):.0%}，"
+              f"总耗时 {seconds / base_seconds:.2f}x")
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='将Markdown转换为PDF')
     parser.add_argument('md_path', help='Markdown文件路径')
     parser.add_argument('pdf_path', help='输出PDF文件路径')
@@ -339,8 +613,18 @@ def main():
                        help='添加目录（TODO：未实现）')
     parser.add_argument('--chinese-punctuation', action='store_true',
                        help='优化中文标点显示')
-
-    args = parser.parse_args()
+    parser.add_argument('--image-dpi', type=image_dpi_type, default=DEFAULT_IMAGE_DPI,
+                       help=f'图片按该打印分辨率缩小后再嵌入（默认：{DEFAULT_IMAGE_DPI}）')
+    parser.add_argument('--jpeg-quality', type=int, default=DEFAULT_JPEG_QUALITY,
+                       help=f'照片类图片重新压缩为JPEG的质量（默认：{DEFAULT_JPEG_QUALITY}）')
+    parser.add_argument('--no-optimize-images', action='store_true',
+                       help='按原始分辨率嵌入图片（可用来对比文件大小和渲染耗时）')
+    parser.add_argument('--font-stats', action='store_true',
+                       help='生成后重新读取PDF，统计每个嵌入字体的大小和字形数')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='对比原图嵌入、图片预处理和WeasyPrint内置图片压缩的PDF大小与耗时')
+
+    args = parser.parse_args(argv)
 
     # 检查输入文件
     md_path = Path(args.md_path)
@@ -360,18 +644,41 @@ def main():
     print(f"✒️  字体：{args.font_family}")
     print()
 
+    if args.benchmark:
+        run_benchmark(md_path, pdf_path, args.images_dir, args.image_dpi or DEFAULT_IMAGE_DPI,
+                      args.jpeg_quality)
+        return
+
     try:
         result = generate_pdf(
             md_path,
             pdf_path,
             images_dir=args.images_dir,
             font_family=args.font_family,
-            page_size=args.page_size
+            page_size=args.page_size,
+            image_dpi=0 if args.no_optimize_images else args.image_dpi,
+            jpeg_quality=args.jpeg_quality,
+            font_stats=args.font_stats
         )
 
         print()
         print("📊 生成统计：")
         print(f"  • 文件大小：{result['size_mb']:.2f} MB")
+        print(f"  • 字体加载：{result['font_config_seconds']:.2f} 秒")
+        print(f"  • 渲染耗时：{result['render_seconds']:.2f} 秒")
+        if result['fonts'] is not None:
+            font_bytes = sum(font['bytes'] for font in result['fonts'])
+            print(f"  • 嵌入字体：{len(result['fonts'])} 个，共 {font_bytes / 1024:.1f} KB（解压后）")
+            for font in result['fonts']:
+                glyphs = f"{font['glyphs']} 个字形" if font['glyphs'] is not None else "字形数未知"
+                print(f"    - {font['name']}：{font['bytes'] / 1024:.1f} KB，{glyphs}")
+        images = result['images']
+        if images and images['images']:
+            saved = images['original_bytes'] - images['optimized_bytes']
+            print(f"  • 图片：{images['images']} 张，{images['original_bytes'] / 1024 / 1024:.2f} MB → "
+                  f"{images['optimized_bytes'] / 1024 / 1024:.2f} MB"
+                  f"（节省 {saved / max(images['original_bytes'], 1):.0%}，"
+                  f"预处理 {images['seconds']:.2f} 秒，缓存命中 {images['cached']} 张）")
         print(f"  • 输出路径：{result['path']}")
         print()
 
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+PDF一次性导入脚本
+每页只用pdfplumber解析一次，同时输出文本文件、图片和charts_manifest.json
+（相当于 extract_text.py + extract_charts.py，但不重复解析PDF）
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import extract_text
+import extract_charts
+
+
+def iter_ingest_pages(pdf, charts_dir, charts_info, cache=None, figures_dpi=None,
+                      dedup=True, verbose=True):
+    """逐页产出 (页码, 文本, 引擎)，同时把该页的图片信息追加到 charts_info
+
+    传入figures_dpi时还会检测图表区域，按该分辨率裁剪渲染。
+
+    传入cache时文本优先读缓存，新提取的文本也会写回缓存，与 extract_text.py 共用。
+    """
+    total_pages = len(pdf.pages)
+    seen = {} if dedup else None
+
+    for page_num, page in enumerate(pdf.pages, 1):
+        if verbose:
+            print(f"⏳ 处理第 {page_num}/{total_pages} 页...", end='\r')
+
+        page_text = cache.get(page_num) if cache is not None else None
+        engine = 'cache'
+        if page_text is None:
+            page_text = page.extract_text()
+            engine = 'pdfplumber'
+            if cache is not None:
+                cache.put(page_num, page_text)
+
+        charts_info.extend(extract_charts.extract_page_images(
+            page, page_num, charts_dir, verbose, seen))
+        if figures_dpi:
+            charts_info.extend(extract_charts.extract_page_figures(
+                page, page_num, charts_dir, figures_dpi, verbose, seen))
+
+        # 文本和图片都取完后再释放该页缓存的对象
+        page.close()
+
+        yield page_num, page_text, engine
+
+    if verbose:
+        print()  # 换行
+
+
+def ingest_pdf(pdf_path, text_path, charts_dir, cache=None, full_page=False,
+               figures=False, dpi=200, dedup=True, verbose=True):
+    """一次解析PDF，写出文本、图片和图表清单
+
+    返回 (文本统计, 总页数, 图表信息列表)。
+    """
+    charts_dir = Path(charts_dir)
+    charts_dir.mkdir(parents=True, exist_ok=True)
+    Path(text_path).parent.mkdir(parents=True, exist_ok=True)
+
+    charts_info = []
+    with extract_text.pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        if verbose:
+            print(f"📄 PDF总页数：{total_pages}")
+        if cache is not None:
+            cache.page_count = total_pages
+
+        pages = iter_ingest_pages(pdf, charts_dir, charts_info, cache,
+                                  dpi if figures else None, dedup, verbose)
+        stats, total_pages = extract_text.extract_to_file(pages, text_path)
+
+    # 整页渲染由poppler完成，页数直接沿用本次解析的结果
+    if full_page:
+        if verbose:
+            print("🖼️  生成完整页面图片...")
+        try:
+            charts_info.extend(extract_charts.render_full_pages(
+                pdf_path, charts_dir, total_pages, dpi=dpi, verbose=verbose))
+        except ImportError:
+            if verbose:
+                print("⚠️  警告：pdf2image未安装，跳过完整页面图片生成")
+
+    extract_charts.save_charts_manifest(charts_info, charts_dir)
+
+    return stats, total_pages, charts_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description='一次解析PDF，同时提取文本和图表')
+    parser.add_argument('pdf_path', help='PDF文件路径')
+    parser.add_argument('text_output', help='输出文本文件路径')
+    parser.add_argument('charts_dir', help='图表输出目录路径')
+    parser.add_argument('--full-page', action='store_true',
+                       help='将每页转为完整图片（需要pdf2image）')
+    parser.add_argument('--db',
+                       help='同时把图表清单写入该SQLite数据库（重复运行会更新记录）')
+    parser.add_argument('--no-dedup', action='store_true',
+                       help='不按内容去重，重复出现的图片每次都写出文件')
+    parser.add_argument('--figures', action='store_true',
+                       help='检测矢量图表区域，只裁剪渲染这些区域')
+    parser.add_argument('--dpi', type=int, default=200,
+                       help='整页图片/图表区域的分辨率（默认：200）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='不读写文本提取缓存')
+    parser.add_argument('--cache-dir', default=str(extract_text.DEFAULT_CACHE_DIR),
+                       help='文本提取缓存目录（与extract_text.py共用）')
+
+    args = parser.parse_args()
+
+    # 检查输入文件
+    pdf_path = Path(args.pdf_path)
+    if not pdf_path.exists():
+        print(f"❌ 错误：找不到PDF文件：{pdf_path}")
+        sys.exit(1)
+
+    if not extract_charts.LIBRARIES_AVAILABLE:
+        print("❌ 错误：缺少必要的库")
+        print("请运行：pip install pdfplumber Pillow pdf2image")
+        sys.exit(1)
+
+    print(f"📚 开始导入PDF...")
+    print(f"📂 输入文件：{pdf_path}")
+    print(f"📝 文本输出：{args.text_output}")
+    print(f"📁 图表目录：{args.charts_dir}")
+    print()
+
+    try:
+        start = time.perf_counter()
+
+        cache = None
+        if not args.no_cache:
+            cache = extract_text.PageCache(args.cache_dir, pdf_path, 'pdfplumber')
+
+        stats, total_pages, charts_info = ingest_pdf(
+            pdf_path, args.text_output, args.charts_dir,
+            cache=cache, full_page=args.full_page, figures=args.figures, dpi=args.dpi,
+            dedup=not args.no_dedup)
+
+        if args.db:
+            import charts_db
+            conn = charts_db.open_db(args.db)
+            charts_db.upsert_charts(conn, pdf_path, args.charts_dir, charts_info)
+            conn.close()
+
+        elapsed = time.perf_counter() - start
+
+        print()
+        print("✅ 导入完成！")
+        print()
+        print("📊 统计信息：")
+        print(f"  • 总页数：{total_pages}")
+        print(f"  • 总字符：{stats.total_chars:,}")
+        print(f"  • 中文字符：{stats.chinese_chars:,}")
+        print(f"  • 总字数（估算）：{stats.total_words:,}")
+        print(f"  • 段落数：{stats.paragraphs}")
+        print(f"  • 提取图片/图表：{len(charts_info)} 个")
+        occurrences, duplicates, saved_bytes = extract_charts.dedup_summary(charts_info)
+        if duplicates:
+            print(f"  • 重复图片：{duplicates} 次出现未重复写出"
+                  f"（节省 {saved_bytes / 1024:.1f} KB）")
+        print(f"  • 耗时：{elapsed:.2f} 秒")
+        print()
+        print(f"  文本文件：{args.text_output}")
+        print(f"  清单文件：{Path(args.charts_dir) / 'charts_manifest.json'}")
+
+        # 所有输出都写完后再淘汰旧缓存
+        if cache is not None:
+            cache.evict()
+
+    except Exception as e:
+        print(f"\n❌ 导入失败：{e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+PDF渲染常驻服务
+启动后在Unix socket上等待渲染请求，工作进程预先导入markdown2/WeasyPrint并加载字体，
+每次生成PDF不再承担导入和字体发现的开销
+
+使用方法：
+    python pdf_server.py serve --workers 2                         # 启动服务
+    python pdf_server.py render article.md article.pdf [选项]       # 提交任务，选项同 generate_pdf.py
+    python pdf_server.py status / stop
+
+客户端只转发命令行参数，由服务端用 generate_pdf.py 的参数解析处理，
+服务未启动时客户端直接在本进程中生成。
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+
+# 默认socket路径，可通过环境变量 ARTICLE_WRITER_CACHE 指定缓存根目录
+DEFAULT_SOCKET = Path(os.environ.get(
+    'ARTICLE_WRITER_CACHE', Path.home() / '.cache' / 'article-writer'
+)) / 'pdf_server.sock'
+DEFAULT_WORKERS = 2
+
+
+def _warm_worker():
+    """工作进程初始化：导入渲染库并预先加载字体"""
+    import generate_pdf
+    if not generate_pdf.WEASYPRINT_AVAILABLE:
+        return
+    try:
+        generate_pdf.warm_up()
+    except Exception as e:
+        # 预热失败不影响服务，真正的问题会在渲染任务的输出中报告
+        print(f"⚠️  警告：工作进程预热失败：{e}", file=sys.stderr)
+
+
+def run_job(argv, cwd):
+    """在工作进程中执行一次 generate_pdf.py，返回 (退出码, 输出)"""
+    import generate_pdf
+
+    output = io.StringIO()
+    returncode = 0
+    os.chdir(cwd)
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            generate_pdf.main(argv)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            print(f"\n❌ PDF生成失败：{e}")
+            returncode = 1
+    return returncode, output.getvalue()
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """每个连接一个线程，实际渲染交给进程池"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, executor, workers):
+        self.executor = executor
+        self.workers = workers
+        self.executor_lock = threading.Lock()
+        self.started = time.time()
+        self.jobs = 0
+        self.jobs_lock = threading.Lock()
+        super().__init__(str(socket_path), RenderHandler)
+
+    def restart_executor(self, broken):
+        """工作进程异常退出后进程池不可再用，换一个新的（多个线程同时发现时只重建一次）"""
+        with self.executor_lock:
+            if self.executor is broken:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    initializer=_warm_worker)
+                broken.shutdown(wait=False)
+
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    """一行JSON请求，一行JSON响应"""
+
+    def handle(self):
+        start = time.perf_counter()
+        try:
+            response = self.dispatch(json.loads(self.rfile.readline().decode('utf-8')))
+        except BrokenProcessPool:
+            self.server.restart_executor(self.executor)
+            response = {'returncode': 1, 'output': "❌ PDF生成失败：渲染进程异常退出，已重启进程池\n",
+                        'seconds': time.perf_counter() - start}
+        except Exception as e:
+            response = {'returncode': 1, 'output': f"❌ 错误：无法处理请求：{type(e).__name__}: {e}\n",
+                        'seconds': time.perf_counter() - start}
+
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def dispatch(self, request):
+        """处理一个请求，返回响应字典"""
+        command = request.get('command', 'render')
+
+        if command == 'render':
+            start = time.perf_counter()
+            # 记下提交时用的进程池，进程池损坏时只重建这一个
+            self.executor = self.server.executor
+            future = self.executor.submit(run_job, request['argv'], request['cwd'])
+            returncode, output = future.result()
+            with self.server.jobs_lock:
+                self.server.jobs += 1
+            response = {'returncode': returncode, 'output': output,
+                        'seconds': time.perf_counter() - start}
+        elif command == 'status':
+            response = {'pid': os.getpid(), 'jobs': self.server.jobs,
+                        'uptime': time.time() - self.server.started}
+        elif command == 'stop':
+            response = {'stopping': True}
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            response = {'error': f'未知命令：{command}'}
+
+        return response
+
+
+def send_request(socket_path, request, timeout=None):
+    """向服务发送一个请求并返回响应，服务未启动时返回None"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        stream.flush()
+        line = stream.readline()
+
+    # 服务在处理过程中退出时收不到响应，按服务未启动处理
+    if not line.strip():
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+def serve(socket_path, workers):
+    """启动服务，直到收到stop请求或Ctrl+C"""
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if socket_path.exists():
+        if send_request(socket_path, {'command': 'status'}, timeout=5) is not None:
+            print(f"❌ 错误：服务已在运行：{socket_path}")
+            sys.exit(1)
+        # 上次异常退出留下的socket文件
+        socket_path.unlink()
+
+    print(f"🔥 启动 {workers} 个工作进程并预加载字体...")
+    start = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+    # 进程池按需启动工作进程，这里先各提交一个空任务让它们全部就绪
+    for future in [executor.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    print(f"✅ 预热完成（{time.perf_counter() - start:.2f} 秒）")
+
+    # socket只允许当前用户访问：绑定时就用受限的umask创建，不留其他用户可连接的窗口
+    old_umask = os.umask(0o077)
+    try:
+        server = RenderServer(socket_path, executor, workers)
+    finally:
+        os.umask(old_umask)
+    print(f"🔌 监听：{socket_path}")
+    print("   提交任务：python pdf_server.py render article.md article.pdf")
+
+    # 被kill时同样走下面的清理流程，删除socket文件
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+        server.executor.shutdown()
+        if socket_path.exists():
+            socket_path.unlink()
+        print(f"👋 服务已停止（共处理 {server.jobs} 个任务）")
+
+
+def render(socket_path, argv):
+    """把 generate_pdf.py 的参数发给服务渲染，服务未启动时在本进程中生成"""
+    start = time.perf_counter()
+    response = send_request(socket_path, {'command': 'render', 'argv': argv, 'cwd': os.getcwd()})
+
+    if response is None:
+        print(f"⚠️  渲染服务未启动（{socket_path}），在本进程中生成")
+        print()
+        import generate_pdf
+        generate_pdf.main(argv)
+        return
+
+    sys.stdout.write(response['output'])
+    print(f"⚡ 渲染服务耗时：{response['seconds']:.2f} 秒"
+          f"（含通信共 {time.perf_counter() - start:.2f} 秒）")
+    if response['returncode']:
+        sys.exit(response['returncode'])
+
+
+def split_render_argv(argv):
+    """在 render 子命令处切开参数，返回 (本脚本的参数, 原样转发给 generate_pdf.py 的参数)
+
+    render 之后的参数不经过本脚本解析，选项放在位置参数前面也能原样转发。
+    不是 render 命令时第二项为None。
+    """
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg == '--socket':
+            index += 2
+            continue
+        if arg == 'render':
+            return argv[:index + 1], argv[index + 1:]
+        if not arg.startswith('-'):
+            break
+        index += 1
+    return argv, None
+
+
+def main(argv=None):
+    argv, render_argv = split_render_argv(sys.argv[1:] if argv is None else list(argv))
+
+    parser = argparse.ArgumentParser(
+        description='PDF渲染常驻服务：保持WeasyPrint和字体加载状态，处理generate_pdf.py任务')
+    parser.add_argument('--socket', default=str(DEFAULT_SOCKET),
+                       help=f'Unix socket路径（默认：{DEFAULT_SOCKET}）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='启动服务')
+    serve_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                             help=f'渲染进程数（默认：{DEFAULT_WORKERS}）')
+
+    # render 之后的参数由 split_render_argv 原样转发，不在这里解析
+    subparsers.add_parser(
+        'render', help='提交渲染任务（参数与 generate_pdf.py 相同）',
+        usage='%(prog)s [generate_pdf.py 的参数...]', add_help=False)
+
+    subparsers.add_parser('status', help='查看服务状态')
+    subparsers.add_parser('stop', help='停止服务')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.socket, args.workers)
+
+    elif args.command == 'render':
+        render(args.socket, render_argv)
+
+    else:
+        response = send_request(args.socket, {'command': args.command}, timeout=10)
+        if response is None:
+            print(f"❌ 渲染服务未启动：{args.socket}")
+            sys.exit(1)
+        if args.command == 'status':
+            print(f"✅ 渲染服务运行中（PID {response['pid']}）")
+            print(f"  • 已处理任务：{response['jobs']}")
+            print(f"  • 运行时间：{response['uptime'] / 60:.1f} 分钟")
+        else:
+            print("👋 已通知渲染服务停止")
+
+
+if __name__ == '__main__':
+    main()
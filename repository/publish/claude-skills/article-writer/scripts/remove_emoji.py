@@ -5,165 +5,363 @@ Emoji移除工具
 
 使用方法：
     python remove_emoji.py input.md [output.md]
+    python remove_emoji.py input.md --fonts    # 只移除PDF字体中没有字形的字符
 
-如果不指定output.md，会直接覆盖输入文件（会先备份为.bak）
+如果不指定output.md，会直接覆盖输入文件（默认先备份为.bak）
+文件按块流式处理，先写到同目录的临时文件，完成后原子替换目标文件
 """
 
+import os
 import re
 import sys
+import time
 import shutil
+import argparse
+import tempfile
+from bisect import bisect_right
+from collections import Counter
 from pathlib import Path
 
+import font_coverage
+
+
+# emoji码位范围及类别（按起始码位排序，便于二分查找类别）
+EMOJI_RANGES = (
+    ('\u23f0', '\u23f0', '其他符号'),            # alarm clock
+    ('\u24c2', '\u24c2', '带圈字符'),            # circled M
+    ('\u25aa', '\u25fe', '几何图形'),            # geometric shapes（▪️◼️▶️◀️）
+    ('\u2600', '\u26ff', '杂项符号'),            # Miscellaneous Symbols
+    ('\u2700', '\u27bf', '装饰符号'),            # Dingbats（含✅❌✓✔✗✘）
+    ('\u2934', '\u2935', '箭头'),                # ⤴️⤵️
+    ('\u2b05', '\u2b07', '箭头'),                # ⬅️⬆️⬇️
+    ('\u2b1b', '\u2b1c', '几何图形'),            # ⬛⬜
+    ('\u2b50', '\u2b50', '其他符号'),            # star
+    ('\u2b55', '\u2b55', '其他符号'),            # ⭕
+    ('\u3030', '\u3030', '其他符号'),            # 〰️（其余CJK标点保留）
+    ('\u303d', '\u303d', '其他符号'),            # 〽️
+    ('\u3297', '\u3297', '带圈字符'),            # ㊗️
+    ('\u3299', '\u3299', '带圈字符'),            # ㊙️
+    ('\U0001f004', '\U0001f004', '游戏符号'),    # 🀄
+    ('\U0001f0cf', '\U0001f0cf', '游戏符号'),    # 🃏
+    ('\U0001f170', '\U0001f1df', '带圈字符'),      # enclosed alphanumeric supplement
+    ('\U0001f1e0', '\U0001f1ff', '旗帜'),          # flags (iOS)
+    ('\U0001f200', '\U0001f251', '带圈字符'),      # enclosed ideographic supplement
+    ('\U0001f300', '\U0001f5ff', '符号和图形'),    # symbols & pictographs
+    ('\U0001f600', '\U0001f64f', '表情'),          # emoticons
+    ('\U0001f680', '\U0001f6ff', '交通和地图'),    # transport & map symbols
+    ('\U0001f780', '\U0001f8ff', '几何图形'),      # Geometric Shapes Extended, Supplemental Arrows-C
+    ('\U0001f900', '\U0001f9ff', '补充符号和图形'),  # Supplemental Symbols and Pictographs
+    ('\U0001fa00', '\U0001faff', '扩展符号和图形'),  # Chess Symbols, Symbols and Pictographs Extended-A
+)
+_RANGE_STARTS = [start for start, _, _ in EMOJI_RANGES]
+
+# 紧跟在emoji后面的修饰字符：变体选择符、零宽连接符、组合键帽、肤色
+EMOJI_MODIFIERS = '\ufe0e\ufe0f\u200d\u20e3\U0001f3fb-\U0001f3ff'
+_MODIFIER_CHARS = set('\ufe0e\ufe0f\u200d\u20e3') | {chr(c) for c in range(0x1f3fb, 0x1f400)}
+
+# 一段连续的emoji（含修饰字符）匹配一次，必须以emoji开头，修饰字符单独出现时不动
+# （以单个字符集开头，正则引擎可以快速跳过不含emoji的正文）
+_EMOJI_CLASS = ''.join(f'{start}-{end}' for start, end, _ in EMOJI_RANGES)
+EMOJI_PATTERN = re.compile(f'[{_EMOJI_CLASS}][{_EMOJI_CLASS}{EMOJI_MODIFIERS}]*')
+
+# 键帽（如1️⃣）以普通数字开头，只在文本含组合键帽符时才额外匹配
+KEYCAP_PATTERN = re.compile('[#*0-9]\ufe0f?\u20e3')
+
+# 流式处理时每次读入的大致字节数（按整行读取，emoji序列不会被切断）
+CHUNK_SIZE = 1 << 20
+
+
+def emoji_category(char, default='其他字符'):
+    """返回emoji字符所属的类别，不在emoji范围内时返回default"""
+    index = bisect_right(_RANGE_STARTS, char) - 1
+    if index >= 0 and char <= EMOJI_RANGES[index][1]:
+        return EMOJI_RANGES[index][2]
+    return default
+
+
+class EmojiScrubber:
+    """预编译的emoji清理器：一次遍历同时移除emoji并按类别计数
+
+    同一个实例可以连续处理多段文本（如逐块处理大文件），counts 会累加。
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def _remove(self, match):
+        for char in match.group():
+            if char not in _MODIFIER_CHARS:
+                self.counts[emoji_category(char)] += 1
+        return ''
+
+    def _remove_keycap(self, match):
+        self.counts['键帽'] += 1
+        return ''
+
+    def scrub(self, text):
+        """返回移除emoji后的文本，同时累计各类别数量"""
+        if '\u20e3' in text:
+            text = KEYCAP_PATTERN.sub(self._remove_keycap, text)
+        return EMOJI_PATTERN.sub(self._remove, text)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+class CoverageScrubber:
+    """按PDF字体的实际覆盖范围清理：只移除（或替换）字体中没有字形的字符
+
+    接口与 EmojiScrubber 相同。每种字符只查一次覆盖位图，
+    之后每块文本只匹配其中出现过的缺字，连同紧跟的修饰字符一起处理。
+    """
+
+    def __init__(self, coverage, replacement=''):
+        self.coverage = coverage
+        self.replacement = replacement
+        self.counts = Counter()
+        self._checked = set()
+        self._missing = set()
+
+    def _replace(self, match):
+        self.counts[emoji_category(match.group()[0])] += 1
+        return self.replacement
+
+    def scrub(self, text):
+        """返回处理后的文本，同时累计各类别数量"""
+        chars = set(text)
+        new_chars = chars - self._checked
+        if new_chars:
+            self._checked |= new_chars
+            self._missing.update(char for char in new_chars if not self.coverage.covers(char))
+
+        missing = ''.join(sorted(self._missing & chars))
+        if not missing:
+            return text
+        pattern = re.compile(f'[{re.escape(missing)}][{EMOJI_MODIFIERS}]*')
+        return pattern.sub(self._replace, text)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
 
 def remove_emojis(text):
     """移除所有emoji字符和特殊符号"""
-
-    # Unicode emoji范围
-    emoji_pattern = re.compile(
-        "["
-        u"\U0001F600-\U0001F64F"  # emoticons
-        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        u"\U00002702-\U000027B0"  # dingbats
-        u"\U000024C2-\U0001F251"  # enclosed characters
-        u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        u"\U0001FA00-\U0001FA6F"  # Chess Symbols
-        u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-        u"\U00002600-\U000026FF"  # Miscellaneous Symbols
-        u"\U00002700-\U000027BF"  # Dingbats
-        "]+",
-        flags=re.UNICODE,
-    )
-
-    # 移除emoji
-    text = emoji_pattern.sub(r"", text)
-
-    # 移除常见的unicode符号（这些在某些字体中可能显示不正确）
-    problematic_chars = {
-        "✅": "",  # check mark
-        "☑": "",  # ballot box with check
-        "✓": "",  # check mark
-        "✔": "",  # heavy check mark
-        "❌": "",  # cross mark
-        "✗": "",  # ballot x
-        "✘": "",  # heavy ballot x
-        "⭐": "",  # star
-        "🎯": "",  # direct hit
-        "📊": "",  # bar chart
-        "📈": "",  # chart increasing
-        "📉": "",  # chart decreasing
-        "🎨": "",  # artist palette
-        "🖼": "",  # framed picture
-        "💡": "",  # light bulb
-        "🔍": "",  # magnifying glass
-        "🔧": "",  # wrench
-        "⚙": "",  # gear
-        "🎭": "",  # performing arts
-        "🎪": "",  # circus tent
-        "💼": "",  # briefcase
-        "📱": "",  # mobile phone
-        "💻": "",  # laptop
-        "⏰": "",  # alarm clock
-        "🚀": "",  # rocket
-        "🔒": "",  # locked
-        "🔓": "",  # unlocked
-        "📢": "",  # loudspeaker
-        "📣": "",  # megaphone
-        "🛒": "",  # shopping cart
-        "💰": "",  # money bag
-        "💵": "",  # dollar banknote
-        "🎉": "",  # party popper
-        "🎊": "",  # confetti ball
-    }
-
-    for char, replacement in problematic_chars.items():
-        text = text.replace(char, replacement)
-
-    return text
+    return EmojiScrubber().scrub(text)
 
 
 def count_emojis(text):
     """统计文本中的emoji数量"""
-    emoji_pattern = re.compile(
-        "["
-        u"\U0001F600-\U0001F64F"
-        u"\U0001F300-\U0001F5FF"
-        u"\U0001F680-\U0001F6FF"
-        u"\U0001F1E0-\U0001F1FF"
-        u"\U00002702-\U000027B0"
-        u"\U000024C2-\U0001F251"
-        u"\U0001F900-\U0001F9FF"
-        u"\U0001FA00-\U0001FA6F"
-        u"\U0001FA70-\U0001FAFF"
-        u"\U00002600-\U000026FF"
-        u"\U00002700-\U000027BF"
-        "]+",
-        flags=re.UNICODE,
-    )
-
-    matches = emoji_pattern.findall(text)
-
-    # 也计算特殊字符
-    special_chars = ["✅", "☑", "✓", "✔", "❌", "✗", "✘"]
-    special_count = sum(text.count(char) for char in special_chars)
-
-    return len(matches) + special_count
+    scrubber = EmojiScrubber()
+    scrubber.scrub(text)
+    return scrubber.total
+
+
+def iter_chunks(f, chunk_size=CHUNK_SIZE):
+    """按整行分块读取文件，每块约 chunk_size 字节"""
+    while True:
+        lines = f.readlines(chunk_size)
+        if not lines:
+            return
+        yield ''.join(lines)
+
+
+def scan_file(input_file, chunk_size=CHUNK_SIZE, scrubber=None):
+    """流式统计文件中的emoji，不写出任何内容，返回 scrubber"""
+    scrubber = scrubber or EmojiScrubber()
+    with open(input_file, "r", encoding="utf-8", newline='') as f:
+        for chunk in iter_chunks(f, chunk_size):
+            scrubber.scrub(chunk)
+    return scrubber
+
+
+def make_backup(input_file):
+    """备份原文件为.bak，能建硬链接时不复制内容"""
+    backup_file = input_file.with_suffix(input_file.suffix + ".bak")
+    if backup_file.exists():
+        backup_file.unlink()
+    try:
+        # 随后原文件会被新文件原子替换，硬链接保留的正是旧内容
+        os.link(input_file, backup_file)
+    except OSError:
+        shutil.copy2(input_file, backup_file)
+    return backup_file
+
+
+def clean_file(input_file, output_file=None, backup=True, chunk_size=CHUNK_SIZE,
+               scrubber=None):
+    """流式移除文件中的emoji
+
+    逐块写入目标目录下的临时文件，全部成功后用 os.replace 原子替换目标文件，
+    中途出错不会留下写了一半的文章。未指定 output_file 时覆盖输入文件。
+    文件中没有emoji时不写出任何内容。scrubber 默认为 EmojiScrubber。
+
+    返回 (scrubber, 备份文件路径或None)。
+    """
+    input_file = Path(input_file)
+    output_file = Path(output_file) if output_file else input_file
+    in_place = output_file.resolve() == input_file.resolve()
+
+    scrubber = scrubber or EmojiScrubber()
+    fd, temp_path = tempfile.mkstemp(
+        dir=output_file.parent, prefix=f".{output_file.name}.", suffix=".tmp")
+    try:
+        with open(input_file, "r", encoding="utf-8", newline='') as src, \
+                os.fdopen(fd, "w", encoding="utf-8", newline='') as dst:
+            for chunk in iter_chunks(src, chunk_size):
+                dst.write(scrubber.scrub(chunk))
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        if scrubber.total == 0 and in_place:
+            os.unlink(temp_path)
+            return scrubber, None
+
+        # 保留原文件的权限
+        shutil.copymode(input_file, temp_path)
+        backup_file = make_backup(input_file) if in_place and backup else None
+        os.replace(temp_path, output_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    return scrubber, backup_file
+
+
+def _legacy_clean(text):
+    """逐条 str.replace 的原实现流程（计数、移除、再计数），仅供基准测试对比耗时"""
+    def compile_pattern():
+        return re.compile(
+            '[' + ''.join(f'{start}-{end}' for start, end, _ in EMOJI_RANGES) + ']+')
+
+    special_chars = ["✅", "☑", "✓", "✔", "❌", "✗", "✘", "⭐", "🎯", "📊", "📈", "📉",
+                     "🎨", "🖼", "💡", "🔍", "🔧", "⚙", "🎭", "🎪", "💼", "📱", "💻", "⏰",
+                     "🚀", "🔒", "🔓", "📢", "📣", "🛒", "💰", "💵", "🎉", "🎊"]
+
+    def count(value):
+        return (len(compile_pattern().findall(value))
+                + sum(value.count(char) for char in special_chars[:7]))
+
+    before = count(text)
+    cleaned = compile_pattern().sub('', text)
+    for char in special_chars:
+        cleaned = cleaned.replace(char, '')
+    count(cleaned)
+    return cleaned, before
+
+
+def run_benchmark(input_file, repeat=3):
+    """对比原实现流程与单次遍历清理的耗时"""
+    with open(input_file, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    print(f"⏱️  基准测试：{input_file}（{len(content.encode('utf-8')) / 1024 / 1024:.1f} MB，取{repeat}次最快）")
+
+    timings = {}
+    for name, func in (('原实现（多次扫描）', _legacy_clean), ('单次遍历', remove_emojis)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(content)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+
+    scrubber = EmojiScrubber()
+    scrubber.scrub(content)
+
+    print("─" * 60)
+    for name, elapsed in timings.items():
+        print(f"  {name}：{elapsed:.3f} 秒")
+    print(f"  加速比：{timings['原实现（多次扫描）'] / timings['单次遍历']:.2f}x")
+    print(f"  移除emoji：{scrubber.total:,} 个")
+    print("─" * 60)
+
+
+def print_counts(counts):
+    """按数量从多到少打印各类别emoji数"""
+    for category, count in counts.most_common():
+        print(f"  • {category}：{count} 个")
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("用法：python remove_emoji.py <input.md> [output.md]")
-        print()
-        print("示例：")
-        print("  python remove_emoji.py article.md              # 覆盖原文件（会备份）")
-        print("  python remove_emoji.py article.md clean.md     # 输出到新文件")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='移除Markdown文件中的emoji字符（避免PDF乱码）',
+        epilog='示例：\n'
+               '  python remove_emoji.py article.md              # 覆盖原文件（会备份）\n'
+               '  python remove_emoji.py article.md clean.md     # 输出到新文件',
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_file', help='输入Markdown文件')
+    parser.add_argument('output_file', nargs='?',
+                       help='输出文件（不指定则覆盖输入文件，并备份为.bak）')
+    parser.add_argument('--no-backup', action='store_true',
+                       help='覆盖输入文件时不备份为.bak')
+    parser.add_argument('--check', action='store_true',
+                       help='只统计emoji，不修改文件（有emoji时退出码为1）')
+    parser.add_argument('--fonts', action='store_true',
+                       help='按generate_pdf.py所用字体的实际覆盖范围处理：'
+                            '只移除没有字形的字符，字体能显示的符号保留（需要fontTools和fc-match）')
+    parser.add_argument('--font', action='append', default=[],
+                       help='额外计入覆盖范围的字体文件（可多次指定，隐含 --fonts）')
+    parser.add_argument('--replacement', default='',
+                       help='--fonts 模式下用该字符串替换缺字，而不是直接删除')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='对比原实现与单次遍历的耗时，不写出文件')
 
-    input_file = Path(sys.argv[1])
+    args = parser.parse_args()
+
+    input_file = Path(args.input_file)
     if not input_file.exists():
         print(f"❌ 错误：找不到文件 {input_file}")
         sys.exit(1)
 
-    # 读取文件
-    with open(input_file, "r", encoding="utf-8") as f:
-        content = f.read()
+    if args.benchmark:
+        run_benchmark(input_file)
+        return
 
-    # 统计emoji数量
-    emoji_count = count_emojis(content)
+    scrubber = None
+    label = 'emoji字符'
+    done_message = "Emoji已移除"
+    if args.fonts or args.font:
+        if not font_coverage.FONTTOOLS_AVAILABLE:
+            print("❌ 错误：缺少fontTools库")
+            print("请运行：pip install fonttools")
+            sys.exit(1)
+        coverage = font_coverage.FontCoverage.for_pdf(args.font)
+        if not coverage.fonts:
+            print("❌ 错误：没有找到字体（需要fontconfig的fc-match，或用 --font 指定字体文件）")
+            sys.exit(1)
+        print(f"🔤 按 {len(coverage.fonts)} 个字体的覆盖范围处理（共 {coverage.total_glyphs:,} 个码位）")
+        scrubber = CoverageScrubber(coverage, args.replacement)
+        label = '字体中没有字形的字符'
+        done_message = "缺字已替换" if args.replacement else "缺字已移除"
 
-    if emoji_count == 0:
-        print(f"✅ 文件中没有emoji字符，无需处理")
+    if args.check:
+        scrubber = scan_file(input_file, scrubber=scrubber)
+    else:
+        # 一次流式遍历：移除emoji并统计数量，写完后原子替换
+        output_file = Path(args.output_file) if args.output_file else input_file
+        scrubber, backup_file = clean_file(input_file, output_file,
+                                           backup=not args.no_backup, scrubber=scrubber)
+
+    if scrubber.total == 0:
+        print(f"✅ 文件中没有{label}，无需处理")
+        if not args.check and output_file != input_file:
+            print(f"📄 输出文件：{output_file}")
         return
 
-    print(f"🔍 找到 {emoji_count} 个emoji字符")
+    print(f"🔍 找到 {scrubber.total} 个{label}")
+    print_counts(scrubber.counts)
 
-    # 移除emoji
-    cleaned = remove_emojis(content)
+    if args.check:
+        sys.exit(1)
 
-    # 确定输出文件
-    if len(sys.argv) > 2:
-        output_file = Path(sys.argv[2])
-    else:
-        # 备份原文件
-        backup_file = input_file.with_suffix(input_file.suffix + ".bak")
-        shutil.copy2(input_file, backup_file)
+    if backup_file:
         print(f"📦 原文件已备份到：{backup_file}")
-        output_file = input_file
-
-    # 写入清理后的内容
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(cleaned)
-
-    # 验证
-    cleaned_count = count_emojis(cleaned)
-    print(f"✅ Emoji已移除")
+    print(f"✅ {done_message}")
     print(f"📄 输出文件：{output_file}")
-    print(f"📊 移除前：{emoji_count} 个emoji")
-    print(f"📊 移除后：{cleaned_count} 个emoji")
-
-    if cleaned_count > 0:
-        print(f"⚠️  警告：仍有 {cleaned_count} 个emoji未能移除")
 
 
 if __name__ == "__main__":
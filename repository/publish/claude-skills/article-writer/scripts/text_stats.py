@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+文本统计公共模块
+中文字符识别和字数统计，供 count_words.py 和 extract_text.py 共用
+（用预编译正则成段匹配，避免在Python里逐字符循环）
+"""
+
+import sys
+import time
+import argparse
+import re
+from pathlib import Path
+
+
+# 计为中文字符的码位范围
+CJK_RANGES = (
+    ('\u4e00', '\u9fff'),          # 基本区
+    ('\u3400', '\u4dbf'),          # 扩展A
+    ('\U00020000', '\U0002ebef'),  # 扩展B-F
+    ('\U00030000', '\U0003134f'),  # 扩展G
+    ('\uf900', '\ufaff'),          # 兼容汉字
+    ('\U0002f800', '\U0002fa1f'),  # 兼容汉字补充
+)
+CJK_CLASS = ''.join(f'{start}-{end}' for start, end in CJK_RANGES)
+
+# 英文字母，包括全角字母（如“ＧＰＵ”）
+LATIN_CLASS = 'a-zA-Z\uff21-\uff3a\uff41-\uff5a'
+
+CJK_RUN_RE = re.compile(f'[{CJK_CLASS}]+')
+# 英文单词：前后都不是"非中文的单词字符"，等价于把中文替换为空格后再匹配 \b[字母]+\b
+# （以字母开头再回看前一个字符，正则引擎可以直接跳到字母处开始尝试）
+ENGLISH_WORD_RE = re.compile(
+    f'[{LATIN_CLASS}](?<![^\\W{CJK_CLASS}][{LATIN_CLASS}])[{LATIN_CLASS}]*(?![^\\W{CJK_CLASS}])')
+# 既不是中文也不是空白的字符，删掉后剩下的每个词都含有中文
+NON_CJK_RE = re.compile(f'[^\\s{CJK_CLASS}]+')
+
+
+def is_cjk(char):
+    """判断单个字符是否为中文字符（逐字符判断，仅供对照测试）"""
+    return ('\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf'
+            or '\U00020000' <= char <= '\U0002ebef' or '\U00030000' <= char <= '\U0003134f'
+            or '\uf900' <= char <= '\ufaff' or '\U0002f800' <= char <= '\U0002fa1f')
+
+
+def count_chinese_chars(text):
+    """统计中文字符数"""
+    return sum(map(len, CJK_RUN_RE.findall(text)))
+
+
+def count_english_words(text):
+    """统计英文单词数（中文字符视为分隔符）"""
+    return len(ENGLISH_WORD_RE.findall(text))
+
+
+def count_chars_and_tokens(text):
+    """一次统计中文字符数和不含中文的空白分隔词数，返回 (中文字符数, 非中文词数)"""
+    cjk_tokens = NON_CJK_RE.sub('', text).split()
+    chinese_chars = sum(map(len, cjk_tokens))
+    return chinese_chars, len(text.split()) - len(cjk_tokens)
+
+
+def count_words(text):
+    """统计总字数：中文字符 + 按空白分隔且不含中文的词"""
+    chinese_chars, other_tokens = count_chars_and_tokens(text)
+    return chinese_chars + other_tokens
+
+
+def _count_chinese_chars_loop(text):
+    return sum(1 for char in text if is_cjk(char))
+
+
+def _count_english_words_loop(text):
+    text_without_chinese = re.sub(f'[{CJK_CLASS}]', ' ', text)
+    return len(re.findall(f'\\b[{LATIN_CLASS}]+\\b', text_without_chinese))
+
+
+def _count_words_loop(text):
+    words = text.split()
+    return (_count_chinese_chars_loop(text)
+            + sum(1 for word in words if not any(is_cjk(char) for char in word)))
+
+
+def run_benchmark(file_path, repeat=3):
+    """对比逐字符循环与正则批量识别的耗时，并核对结果一致"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    cases = (
+        ('中文字符数', _count_chinese_chars_loop, count_chinese_chars),
+        ('英文单词数', _count_english_words_loop, count_english_words),
+        ('总字数(extract_text)', _count_words_loop, count_words),
+    )
+
+    print(f"⏱️  基准测试：{file_path}（{len(text):,} 字符，取{repeat}次最快）")
+    print("─" * 60)
+    all_equal = True
+    for name, loop_func, fast_func in cases:
+        timings = []
+        results = []
+        for func in (loop_func, fast_func):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = func(text)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+            results.append(result)
+
+        mark = '✓' if results[0] == results[1] else '❌'
+        all_equal = all_equal and results[0] == results[1]
+        print(f"  {mark} {name}：循环 {timings[0]:.3f} 秒 → 正则 {timings[1]:.3f} 秒"
+              f"（{timings[0] / timings[1]:.1f}x，结果 {results[1]:,}）")
+    print("─" * 60)
+
+    return all_equal
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文本统计公共模块：基准测试')
+    parser.add_argument('file_path', help='用于测试的文本文件')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数（默认：3）')
+
+    args = parser.parse_args()
+
+    file_path = Path(args.file_path)
+    if not file_path.exists():
+        print(f"❌ 错误：找不到文件：{file_path}")
+        sys.exit(1)
+
+    if not run_benchmark(file_path, args.repeat):
+        print("❌ 结果不一致")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+charts_db.py 的写入和查询测试
+
+运行：python -m unittest discover tests
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import charts_db  # noqa: E402
+
+
+def make_chart(filename, page, pages=None, **extra):
+    chart = {'filename': filename, 'page': page, 'type': 'embedded',
+             'width': 640, 'height': 480, 'bytes': 1000, 'hash': filename[:8]}
+    if pages:
+        chart['occurrences'] = [{'page': p, 'index': 1, 'bbox': [0, 0, 10, 10]} for p in pages]
+    chart.update(extra)
+    return chart
+
+
+class UpsertChartsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.conn = charts_db.open_db(self.tmp_dir / 'charts.db')
+        self.addCleanup(self.conn.close)
+
+    def count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_insert_and_query(self):
+        charts = [make_chart('a.png', 1, pages=[1, 5]), make_chart('b.png', 2, type='figure')]
+        charts_db.upsert_charts(self.conn, 'doc.pdf', self.tmp_dir, charts)
+
+        self.assertEqual(self.count('charts'), 2)
+        self.assertEqual(self.count('occurrences'), 3)
+        rows = charts_db.query_charts(self.conn, page=5)
+        self.assertEqual([row['filename'] for row in rows], ['a.png'])
+        self.assertEqual(rows[0]['occurrences'], 2)
+        rows = charts_db.query_charts(self.conn, chart_type='figure')
+        self.assertEqual([row['filename'] for row in rows], ['b.png'])
+
+    def test_rerun_updates_and_removes_stale(self):
+        charts_db.upsert_charts(self.conn, 'doc.pdf', self.tmp_dir,
+                                [make_chart('a.png', 1, pages=[1, 5]), make_chart('b.png', 2)])
+        document_id = charts_db.upsert_charts(self.conn, 'doc.pdf', self.tmp_dir,
+                                              [make_chart('a.png', 1, pages=[1], width=800)])
+
+        rows = charts_db.query_charts(self.conn)
+        self.assertEqual([(row['filename'], row['width'], row['occurrences']) for row in rows],
+                         [('a.png', 800, 1)])
+        self.assertEqual(self.count('occurrences'), 1)
+        self.assertEqual(self.count('documents'), 1)
+        total = self.conn.execute("SELECT total_charts FROM documents WHERE id = ?",
+                                  (document_id,)).fetchone()[0]
+        self.assertEqual(total, 1)
+
+    def test_other_documents_untouched(self):
+        charts_db.upsert_charts(self.conn, 'one.pdf', self.tmp_dir, [make_chart('a.png', 1)])
+        charts_db.upsert_charts(self.conn, 'two.pdf', self.tmp_dir, [make_chart('a.png', 3)])
+        charts_db.upsert_charts(self.conn, 'one.pdf', self.tmp_dir, [])
+
+        rows = charts_db.query_charts(self.conn)
+        self.assertEqual([(Path(row['pdf_path']).name, row['page']) for row in rows],
+                         [('two.pdf', 3)])
+        self.assertEqual(self.count('occurrences'), 1)
+
+    @unittest.skipUnless(hasattr(charts_db.sqlite3.Connection, 'setlimit'), '需要Python 3.11+')
+    def test_more_charts_than_sqlite_variables(self):
+        # 把单条语句的参数个数上限调到旧版SQLite的默认值999，图表数超过上限也能写入
+        self.conn.setlimit(charts_db.sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        charts = [make_chart(f'{i:04d}.png', i) for i in range(1, 1201)]
+        charts_db.upsert_charts(self.conn, 'big.pdf', self.tmp_dir, charts)
+        charts_db.upsert_charts(self.conn, 'big.pdf', self.tmp_dir, charts[:10])
+        self.assertEqual(self.count('charts'), 10)
+        self.assertEqual(self.count('occurrences'), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+count_words.py 统计结果的一致性测试
+compute_stats 必须与原始实现 compute_stats_reference 完全一致，
+流式统计（--stream）对常规Markdown文章的结果与整篇统计一致
+
+运行：python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import count_words  # noqa: E402
+
+
+ARTICLE = """# 大模型推理优化
+
+## 一、背景
+
+随着**大语言模型**的普及，推理成本成为瓶颈。本文介绍 KV Cache、
+*量化* 和 [投机解码](https://example.com/spec) 三种方法！
+
+![架构图](images/arch.png)
+
+---
+
+## 二、实现
+
+下面是一段示例代码：
+
+```python
+# 这不是标题
+def decode(tokens):
+    return tokens[-1]
+```
+
+使用 `torch.compile` 之后，吞吐提升约 **2.3 倍**。Is it worth it? Yes.
+
+<div>HTML标签会被去掉</div>
+
+### 2.1 小结
+
+__GPU__ 利用率从 40% 提升到 85%。全角字母ＧＰＵ也计为英文单词。
+没有句末标点的最后一段
+"""
+
+
+def stream_stats(text, chunk_size, remove_markdown=True):
+    counter = count_words.TextCounter(remove_markdown)
+    for block in count_words.iter_text_blocks(io.StringIO(text), chunk_size):
+        counter.feed(block)
+    return counter.result()
+
+
+class ComputeStatsTest(unittest.TestCase):
+
+    def test_matches_reference(self):
+        for remove_markdown in (True, False):
+            with self.subTest(remove_markdown=remove_markdown):
+                self.assertEqual(count_words.compute_stats(ARTICLE * 3, remove_markdown),
+                                 count_words.compute_stats_reference(ARTICLE * 3, remove_markdown))
+
+    def test_counts(self):
+        stats = count_words.compute_stats('中文字数统计。Hello world!\n\n第二段')
+        self.assertEqual(stats['chinese_chars'], 9)
+        self.assertEqual(stats['english_words'], 2)
+        self.assertEqual(stats['total_words'], 11)
+        self.assertEqual(stats['paragraphs'], 2)
+        self.assertEqual(stats['sentences'], 3)
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_stream_matches_whole_text(self):
+        text = ARTICLE * 5
+        expected = count_words.compute_stats(text)
+        for chunk_size in (1, 7, 64, 1000, count_words.CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(stream_stats(text, chunk_size), expected)
+
+    def test_blocks_cover_whole_text(self):
+        text = ARTICLE * 5
+        blocks = list(count_words.iter_text_blocks(io.StringIO(text), 50))
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(''.join(blocks), text)
+        # 代码块不会被切开
+        for block in blocks:
+            self.assertEqual(block.count('```') % 2, 0)
+
+    def test_analyze_text_streams_only_when_asked(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.md', encoding='utf-8',
+                                         delete=False) as f:
+            f.write(ARTICLE * 5)
+        try:
+            expected = count_words.compute_stats(ARTICLE * 5)
+            self.assertEqual(count_words.analyze_text(f.name), expected)
+            self.assertEqual(count_words.analyze_text(f.name, stream=True, chunk_size=64),
+                             expected)
+        finally:
+            os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+extract_charts.py 图表区域检测的测试
+
+运行：python -m unittest discover tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import extract_charts  # noqa: E402
+
+
+class FakePage:
+    """只提供 detect_figure_regions 和 extract_page_figures 用到的属性"""
+
+    def __init__(self, rects, images=(), bbox=(0, 0, 600, 800)):
+        self.bbox = bbox
+        self.rects = [_box_dict(box) for box in rects]
+        self.curves = []
+        self.lines = []
+        self.images = [_box_dict(box) for box in images]
+
+    def to_image(self, resolution):
+        # 每页内容相同：白底上一个黑色方块
+        from PIL import Image, ImageDraw
+        scale = resolution / 72
+        width, height = self.bbox[2] - self.bbox[0], self.bbox[3] - self.bbox[1]
+        image = Image.new('RGB', (round(width * scale), round(height * scale)), 'white')
+        ImageDraw.Draw(image).rectangle((50 * scale, 50 * scale, 150 * scale, 150 * scale),
+                                        fill='black')
+        return type('PageImage', (), {'original': image})()
+
+
+def _box_dict(box):
+    x0, top, x1, bottom = box
+    return {'x0': x0, 'top': top, 'x1': x1, 'bottom': bottom}
+
+
+class DetectFigureRegionsTest(unittest.TestCase):
+
+    def test_merge_chain_reaches_earlier_region(self):
+        # A和B、A和C都不相邻，C和B相邻；B∪C 的外框与A相邻，三者应合并为一个区域
+        a = (0, 0, 100, 100)
+        b = (150, 0, 250, 200)
+        c = (105, 150, 160, 300)
+        gap = extract_charts.FIGURE_MERGE_GAP
+        self.assertFalse(extract_charts._boxes_touch(a, b, gap))
+        self.assertFalse(extract_charts._boxes_touch(a, c, gap))
+        self.assertTrue(extract_charts._boxes_touch(b, c, gap))
+
+        figures = extract_charts.detect_figure_regions(FakePage([a, b, c]))
+        self.assertEqual(len(figures), 1)
+        self.assertEqual(figures[0]['bbox'], (0, 0, 250, 300))
+        self.assertEqual(figures[0]['objects'], 3)
+
+    def test_regions_do_not_touch(self):
+        rects = [(x, y, x + 30, y + 30) for x in range(0, 600, 55) for y in range(0, 800, 170)]
+        rects += [(20, 140, 580, 150), (300, 0, 310, 790)]
+        regions = extract_charts._merge_regions(
+            [(box, False) for box in rects], extract_charts.FIGURE_MERGE_GAP)
+
+        self.assertEqual(sum(r['objects'] for r in regions), len(rects))
+        for i, first in enumerate(regions):
+            for second in regions[i + 1:]:
+                self.assertFalse(extract_charts._boxes_touch(
+                    first['bbox'], second['bbox'], extract_charts.FIGURE_MERGE_GAP))
+
+    def test_regions_inside_embedded_image_skipped(self):
+        # 图片和图片上叠加的矢量标注都已随嵌入图片写出，不再裁剪
+        image = (100, 100, 400, 300)
+        page = FakePage([(120, 120, 200, 180), (250, 200, 380, 280)], images=[image])
+        self.assertEqual(extract_charts.detect_figure_regions(page), [])
+
+    def test_region_extending_past_image_kept(self):
+        # 图片外还有坐标轴等矢量内容时，裁剪整个区域
+        image = (100, 100, 400, 300)
+        page = FakePage([(90, 90, 410, 360)], images=[image])
+        figures = extract_charts.detect_figure_regions(page)
+        self.assertEqual(len(figures), 1)
+        self.assertEqual(figures[0]['bbox'], (90, 90, 410, 360))
+
+    def test_small_and_single_object_regions_dropped(self):
+        page = FakePage([(0, 0, 20, 20), (300, 300, 400, 400)])
+        self.assertEqual(extract_charts.detect_figure_regions(page), [])
+
+
+@unittest.skipUnless(extract_charts.LIBRARIES_AVAILABLE, '需要pdfplumber和Pillow')
+class ExtractPageFiguresTest(unittest.TestCase):
+
+    def test_identical_crops_written_once(self):
+        rects = [(40, 40, 100, 100), (100, 100, 160, 160)]
+        with tempfile.TemporaryDirectory() as output_dir:
+            seen = {}
+            charts_info = []
+            for page_num in (1, 2, 3):
+                charts_info.extend(extract_charts.extract_page_figures(
+                    FakePage(rects), page_num, Path(output_dir), dpi=72, seen=seen))
+
+            self.assertEqual(len(charts_info), 1)
+            self.assertEqual([o['page'] for o in charts_info[0]['occurrences']], [1, 2, 3])
+            self.assertEqual(len(list(Path(output_dir).iterdir())), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
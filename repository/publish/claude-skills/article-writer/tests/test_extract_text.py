@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+extract_text.py 的提取缓存和断点续传测试
+
+运行：python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import extract_text  # noqa: E402
+
+
+PAGE_TEXTS = {1: '第一页', 2: '', 3: '第三页', 4: '第四页'}
+
+
+class FakeExtractor:
+    """代替 iter_pages，记录每次真正提取了哪些页"""
+
+    def __init__(self, fail_after=None):
+        self.calls = []
+        self.fail_after = fail_after
+
+    def __call__(self, pdf_path, method, workers=1, page_numbers=None, verbose=True):
+        self.calls.append(list(page_numbers))
+        for i, page_num in enumerate(page_numbers):
+            if i == self.fail_after:
+                raise RuntimeError('模拟提取中断')
+            yield page_num, PAGE_TEXTS[page_num], method
+
+
+class PageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.extractor = FakeExtractor()
+        patcher = mock.patch.object(extract_text, 'iter_pages', self.extractor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_cache(self, pdf_hash='pdf-a', method='pdfplumber', options=None, max_bytes=1 << 20):
+        return extract_text.PageCache(self.tmp_dir, None, method, options,
+                                      max_bytes=max_bytes, pdf_hash=pdf_hash)
+
+    def extract(self, cache, page_numbers=(1, 2, 3, 4)):
+        return list(extract_text.iter_pages_cached(
+            'doc.pdf', 'pdfplumber', cache, list(page_numbers), verbose=False))
+
+    def test_miss_then_hit(self):
+        first = self.extract(self.make_cache())
+        self.assertEqual(self.extractor.calls, [[1, 2, 3, 4]])
+        self.assertEqual([engine for _, _, engine in first], ['pdfplumber'] * 4)
+
+        second = self.extract(self.make_cache())
+        self.assertEqual(len(self.extractor.calls), 1)
+        self.assertEqual([engine for _, _, engine in second], ['cache'] * 4)
+        # 空白页缓存为空字符串，同样算命中
+        self.assertEqual([(n, text) for n, text, _ in second], sorted(PAGE_TEXTS.items()))
+
+    def test_only_missing_pages_extracted(self):
+        cache = self.make_cache()
+        self.extract(cache)
+        (cache.entry_dir / '3.txt').unlink()
+
+        pages = self.extract(self.make_cache())
+        self.assertEqual(self.extractor.calls[-1], [3])
+        self.assertEqual([engine for _, _, engine in pages],
+                         ['cache', 'cache', 'pdfplumber', 'cache'])
+        self.assertEqual([text for _, text, _ in pages], [PAGE_TEXTS[n] for n in (1, 2, 3, 4)])
+
+    def test_key_depends_on_pdf_method_and_options(self):
+        base = self.make_cache()
+        self.assertEqual(base.key, self.make_cache().key)
+        self.assertNotEqual(base.key, self.make_cache(pdf_hash='pdf-b').key)
+        self.assertNotEqual(base.key, self.make_cache(method='pypdf').key)
+        self.assertNotEqual(base.key, self.make_cache(options={'min_chars': 1}).key)
+
+    def test_page_count(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.page_count)
+        cache.page_count = 4
+        self.assertEqual(self.make_cache().page_count, 4)
+
+    def test_put_after_entry_evicted(self):
+        # 其他进程淘汰了本文档的目录，写缓存时重建目录而不是抛出异常
+        cache = self.make_cache()
+        shutil.rmtree(cache.entry_dir)
+        cache.put(1, '第一页')
+        self.assertEqual(cache.get(1), '第一页')
+        self.assertEqual([p for p in self.tmp_dir.iterdir() if p.is_file()], [])
+
+    def test_evict_oldest_first_keeps_current(self):
+        old = self.make_cache(pdf_hash='old')
+        old.put(1, 'x' * 1000)
+        os.utime(old.entry_dir, (1, 1))
+        other = self.make_cache(pdf_hash='other')
+        other.put(1, 'y' * 1000)
+        os.utime(other.entry_dir, (2, 2))
+        current = self.make_cache(pdf_hash='current', max_bytes=1500)
+        current.put(1, 'z' * 1000)
+        os.utime(current.entry_dir, (0, 0))
+
+        self.assertEqual(current.evict(), 2)
+        self.assertFalse(old.entry_dir.exists())
+        self.assertFalse(other.entry_dir.exists())
+        self.assertEqual(current.get(1), 'z' * 1000)
+
+
+class CheckpointResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.pdf_path = self.tmp_dir / 'doc.pdf'
+        self.pdf_path.write_bytes(b'%PDF-1.4 fake')
+        self.output_path = self.tmp_dir / 'doc.txt'
+        self.checkpoint_path = self.tmp_dir / 'doc.txt.checkpoint.json'
+
+    def run_main(self, extractor, *extra_args):
+        argv = ['extract_text.py', str(self.pdf_path), str(self.output_path),
+                '--method', 'pypdf', '--no-cache', *extra_args]
+        with mock.patch.object(extract_text, 'iter_pages', extractor), \
+                mock.patch.object(extract_text, 'get_page_count', return_value=len(PAGE_TEXTS)), \
+                mock.patch.object(extract_text, 'PYPDF_AVAILABLE', True), \
+                mock.patch.object(sys, 'argv', argv), \
+                contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            try:
+                extract_text.main()
+            except SystemExit as e:
+                return e.code
+        return 0
+
+    def expected_output(self, page_numbers=PAGE_TEXTS):
+        return ''.join(extract_text.format_page(n, PAGE_TEXTS[n])
+                       for n in page_numbers if PAGE_TEXTS[n])
+
+    def test_resume_after_interruption(self):
+        self.assertEqual(self.run_main(FakeExtractor(fail_after=3)), 1)
+        self.assertTrue(self.checkpoint_path.exists())
+        self.assertEqual(self.output_path.read_text(encoding='utf-8'),
+                         self.expected_output([1, 2, 3]))
+
+        # 中断时写了一半的页会在续传时被截掉
+        with open(self.output_path, 'a', encoding='utf-8') as f:
+            f.write('\n====\n第 4 页\n半截')
+
+        extractor = FakeExtractor()
+        self.assertEqual(self.run_main(extractor), 0)
+        self.assertEqual(extractor.calls, [[4]])
+        self.assertEqual(self.output_path.read_text(encoding='utf-8'), self.expected_output())
+        self.assertFalse(self.checkpoint_path.exists())
+
+    def test_restart_ignores_checkpoint(self):
+        self.run_main(FakeExtractor(fail_after=2))
+        extractor = FakeExtractor()
+        self.assertEqual(self.run_main(extractor, '--restart'), 0)
+        self.assertEqual(extractor.calls, [[1, 2, 3, 4]])
+        self.assertEqual(self.output_path.read_text(encoding='utf-8'), self.expected_output())
+
+    def test_checkpoint_for_other_pages_ignored(self):
+        self.run_main(FakeExtractor(fail_after=1), '--pages', '1-2')
+        extractor = FakeExtractor()
+        self.assertEqual(self.run_main(extractor), 0)
+        self.assertEqual(extractor.calls, [[1, 2, 3, 4]])
+        self.assertEqual(self.output_path.read_text(encoding='utf-8'), self.expected_output())
+
+
+if __name__ == '__main__':
+    unittest.main()
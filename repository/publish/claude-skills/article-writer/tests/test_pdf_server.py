@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+pdf_server.py 的参数转发测试：render 之后的参数必须原样交给 generate_pdf.py
+
+运行：python -m unittest discover tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import pdf_server  # noqa: E402
+
+
+class RenderArgvTest(unittest.TestCase):
+
+    def run_main(self, argv):
+        with mock.patch.object(pdf_server, 'render') as render:
+            pdf_server.main(argv)
+        render.assert_called_once()
+        return render.call_args.args
+
+    def test_flags_before_positionals(self):
+        socket_path, argv = self.run_main(
+            ['render', '--images-dir', 'imgs', 'a.md', 'b.pdf'])
+        self.assertEqual(socket_path, str(pdf_server.DEFAULT_SOCKET))
+        self.assertEqual(argv, ['--images-dir', 'imgs', 'a.md', 'b.pdf'])
+
+    def test_flags_after_positionals(self):
+        _, argv = self.run_main(['render', 'a.md', 'b.pdf', '--image-dpi', '150'])
+        self.assertEqual(argv, ['a.md', 'b.pdf', '--image-dpi', '150'])
+
+    def test_socket_option_not_forwarded(self):
+        socket_path, argv = self.run_main(
+            ['--socket', '/tmp/render.sock', 'render', '--no-optimize-images', 'a.md', 'b.pdf'])
+        self.assertEqual(socket_path, '/tmp/render.sock')
+        self.assertEqual(argv, ['--no-optimize-images', 'a.md', 'b.pdf'])
+
+    def test_other_commands_untouched(self):
+        self.assertEqual(pdf_server.split_render_argv(['serve', '--workers', '3']),
+                         (['serve', '--workers', '3'], None))
+        self.assertEqual(pdf_server.split_render_argv(['--socket', 'render', 'status']),
+                         (['--socket', 'render', 'status'], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
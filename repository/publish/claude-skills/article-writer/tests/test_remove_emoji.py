@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+remove_emoji.py 的回归测试
+新的码位范围不能漏掉原实现会移除的emoji，也不能扩大到CJK文字和标点
+
+运行：python -m unittest discover tests
+"""
+
+import re
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import remove_emoji  # noqa: E402
+
+
+# 原实现的正则（24C2-1F251 一段把CJK文字、全角标点等都算作emoji）
+LEGACY_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "\U0001F900-\U0001F9FF"
+    "\U0001FA00-\U0001FA6F"
+    "\U0001FA70-\U0001FAFF"
+    "\U00002600-\U000026FF"
+    "\U00002700-\U000027BF"
+    "]"
+)
+# 原实现在正则之外逐个替换的字符
+LEGACY_SPECIAL_CHARS = set('✅☑✓✔❌✗✘⭐🎯📊📈📉🎨🖼💡🔍🔧⚙🎭🎪💼📱💻⏰🚀🔒🔓📢📣🛒💰💵🎉🎊')
+# 有意新增、原实现没有覆盖的范围（Geometric Shapes Extended 如🟠🟩，Supplemental Arrows-C）
+ADDED_RANGES = (range(0x1F780, 0x1F900),)
+
+# 原实现移除、新范围曾经漏掉的emoji
+REGRESSED_EMOJI = '⭕🀄🃏▶⬆⬅⬇⬛⬜㊙㊗〰〽▪◼◻◽◾⤴⤵'
+
+# 必须原样保留的CJK文字和标点
+CJK_TEXT = '中文测试，。、；：？！“”‘’（）《》【】〈〉「」『』〔〕…—～·가나다ぁアｱＡ１'
+
+
+def in_new_ranges(char):
+    return remove_emoji.EMOJI_PATTERN.fullmatch(char) is not None
+
+
+class EmojiRangeTest(unittest.TestCase):
+
+    def test_regressed_emoji_removed(self):
+        for char in REGRESSED_EMOJI:
+            with self.subTest(char=f'U+{ord(char):04X}'):
+                self.assertTrue(LEGACY_PATTERN.match(char))
+                self.assertTrue(in_new_ranges(char))
+                self.assertEqual(remove_emoji.remove_emojis(f'a{char}️b'), 'ab')
+
+    def test_geometric_shapes_extended_removed(self):
+        for codepoint in range(0x1F780, 0x1F900):
+            char = chr(codepoint)
+            with self.subTest(char=f'U+{codepoint:04X}'):
+                self.assertTrue(in_new_ranges(char))
+
+    def test_new_ranges_within_legacy(self):
+        for start, end, _ in remove_emoji.EMOJI_RANGES:
+            for codepoint in range(ord(start), ord(end) + 1):
+                char = chr(codepoint)
+                if any(codepoint in added for added in ADDED_RANGES):
+                    continue
+                with self.subTest(char=f'U+{codepoint:04X}'):
+                    self.assertTrue(LEGACY_PATTERN.match(char) or char in LEGACY_SPECIAL_CHARS)
+
+    def test_legacy_emoji_blocks_covered(self):
+        # 原实现在 24C2-1F251 之外的各段都是纯emoji块，新范围必须完整覆盖
+        blocks = (range(0x2600, 0x27C0), range(0x1F1E0, 0x1F252), range(0x1F300, 0x1F650),
+                  range(0x1F680, 0x1F700), range(0x1F900, 0x1FB00))
+        for codepoint in (c for block in blocks for c in block):
+            char = chr(codepoint)
+            with self.subTest(char=f'U+{codepoint:04X}'):
+                self.assertTrue(in_new_ranges(char))
+
+    def test_cjk_text_kept(self):
+        self.assertEqual(remove_emoji.remove_emojis(CJK_TEXT), CJK_TEXT)
+
+    def test_ranges_sorted_and_disjoint(self):
+        ranges = remove_emoji.EMOJI_RANGES
+        for (_, prev_end, _), (start, end, _) in zip(ranges, ranges[1:]):
+            self.assertLessEqual(start, end)
+            self.assertLess(prev_end, start)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+text_stats.py 的一致性测试
+正则批量统计必须与逐字符循环的对照实现结果完全一致
+
+运行：python -m unittest discover tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import text_stats  # noqa: E402
+
+
+SAMPLES = (
+    '',
+    '中文字数统计。Hello world!\n\n第二段',
+    '使用torch.compile之后，吞吐提升约2.3倍。Is it worth it? Yes.',
+    'GPU利用率从40%提升到85%，全角字母ＧＰＵ也计为英文单词',
+    'snake_case_name和CamelCase混排，e-mail、don\'t、x86_64',
+    '扩展B𠀀𪛖、兼容汉字豈、扩展A㐀 mixed𠀀word 中a文b字',
+    '  \t\n前后空白　全角空格 不换行空格  ',
+    'abc123def 123 _abc abc_ 中_文 中123文',
+)
+
+# 随机文本的字符池：中文各区、英文字母、全角字母、数字、下划线、标点和各种空白
+ALPHABET = ('中文字汉㐀䶵𠀀𪛖豈丽ǅ' 'abcXYZＡｚ' '0123_' '.,!?，。！？-\'"' ' \t\n　 ')
+
+
+def random_text(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+class TextStatsTest(unittest.TestCase):
+
+    def assert_matches_loop(self, text):
+        with self.subTest(text=text[:40]):
+            self.assertEqual(text_stats.count_chinese_chars(text),
+                             text_stats._count_chinese_chars_loop(text))
+            self.assertEqual(text_stats.count_english_words(text),
+                             text_stats._count_english_words_loop(text))
+            self.assertEqual(text_stats.count_words(text), text_stats._count_words_loop(text))
+            self.assertEqual(text_stats.count_chars_and_tokens(text)[0],
+                             text_stats.count_chinese_chars(text))
+
+    def test_samples(self):
+        for text in SAMPLES:
+            self.assert_matches_loop(text)
+
+    def test_random_text(self):
+        rng = random.Random(20240101)
+        for _ in range(300):
+            self.assert_matches_loop(random_text(rng, rng.randint(1, 80)))
+
+    def test_counts(self):
+        text = '全角ＧＰＵ和GPU-2，共3个 and more'
+        self.assertEqual(text_stats.count_chinese_chars(text), 5)
+        self.assertEqual(text_stats.count_english_words(text), 4)
+        # 含中文的词只计中文字符，其余空白分隔的词各计1
+        self.assertEqual(text_stats.count_words(text), 7)
+
+    def test_cjk_ranges_match_is_cjk(self):
+        for start, end in text_stats.CJK_RANGES:
+            for codepoint in (ord(start) - 1, ord(start), ord(end), ord(end) + 1):
+                char = chr(codepoint)
+                with self.subTest(char=f'U+{codepoint:04X}'):
+                    self.assertEqual(text_stats.count_chinese_chars(char),
+                                     int(text_stats.is_cjk(char)))
+
+
+if __name__ == '__main__':
+    unittest.main()